@@ -5,6 +5,7 @@ from typing import Optional, Tuple, TYPE_CHECKING
 import color
 import exceptions
 from dice import Dice
+from events import ActionsRemaining, AttackRolled, DamageDealt
 
 if TYPE_CHECKING:
     from engine import Engine
@@ -44,17 +45,17 @@ class PickupAction(Action):
         actor_location_y = self.entity.y
         inventory = self.entity.inventory
 
-        for item in self.engine.game_map.items:
-            if actor_location_x == item.x and actor_location_y == item.y:
-                if len(inventory.items) >= inventory.capacity:
-                    raise exceptions.Impossible("Your inventory is full.")
+        for item in self.engine.game_map.get_items_at_location(
+            actor_location_x, actor_location_y
+        ):
+            if not inventory.can_add(item):
+                raise exceptions.Impossible("Your inventory is full.")
 
-                self.engine.game_map.entities.remove(item)
-                item.parent = self.entity.inventory
-                inventory.items.append(item)
+            self.engine.game_map.remove_entity(item)
+            inventory.add(item)
 
-                self.engine.message_log.add_message(f"You picked up the {item.name}!")
-                return
+            self.engine.message_log.add_message(f"You picked up the {item.name}!")
+            return
 
         raise exceptions.Impossible("There is nothing here to pick up.")
 
@@ -144,55 +145,36 @@ class ActionWithDirection(Action):
 
 
 class MeleeAction(ActionWithDirection):
+    noise_radius = 5  # How far away the sound of combat wakes dormant actors.
+
     def perform(self) -> None:
         target = self.target_actor
         if not target:
             raise exceptions.Impossible("Nothing to attack.")
 
+        self.engine.game_map.make_noise(target.x, target.y, self.noise_radius)
+
         #Convereting the default melee action to a PF2E attack roll
         #damage = self.entity.fighter.power - target.fighter.defense
 
-        attack_roll = Dice.roll(1,20, self.entity.fighter.strength_mod)
-        hits = (attack_roll >= target.fighter.ac)
+        stats = self.entity.fighter.stats
+        target_ac = target.fighter.ac
+
+        attack_roll = Dice.roll(1, 20, stats.attack_bonus)
+        hits = (attack_roll >= target_ac)
 
         if (hits):
-            #TODO : Make the attack and damage rolls be handed to this function by the weapon itself, with a default for fists (shown here)
-            damage = Dice.roll(self.entity.equipment.weapon.dice_number,
-                               self.entity.equipment.weapon.dice_size,
-                               self.entity.fighter.strength_mod)
+            damage = Dice.roll(stats.dice_number, stats.dice_size, stats.damage_bonus)
         else:
             damage = 0
 
-        attack_desc = f"{self.entity.name.capitalize()} attempts to attack {target.name}"
-        if self.entity is self.engine.player:
-            attack_color = color.player_atk
-        else:
-            attack_color = color.enemy_atk
+        events = self.engine.events
+        events.publish(AttackRolled(self.entity, target, attack_roll, target_ac, hits))
 
-        if (hits) :
-            self.engine.message_log.add_message(
-                f"{attack_desc} and hits! ({attack_roll} vs. AC{target.fighter.ac})", attack_color
-                )
-        else:
-            self.engine.message_log.add_message(
-                f"{attack_desc} and misses. ({attack_roll} vs. AC{target.fighter.ac})", attack_color
-                )
-
-        if damage > 0 and hits :
-            if self.entity.name == "Player":
-                self.engine.message_log.add_message(
-                    f"{self.entity.name.capitalize()} deals {damage} {self.entity.equipment.weapon.equippable.damage_type} damage.", attack_color
-                )
-            else :
-                self.engine.message_log.add_message(
-                    f"{self.entity.name.capitalize()} deals {damage} {self.entity.equipment.weapon.damage_type} damage.", attack_color
-                )
-            target.fighter.hp -= damage
-        else :
-            if damage == 0 and hits :
-                self.engine.message_log.add_message(
-                    f"However, they deal no damage.", attack_color
-                )
+        if hits and damage >= 0:
+            events.publish(DamageDealt(self.entity, target, damage, stats.damage_type))
+        if damage > 0 and hits:
+            target.fighter.take_damage(damage)
 
 
 # TODO: Add Move Speed
@@ -209,7 +191,7 @@ class MovementAction(ActionWithDirection):
         if not self.engine.game_map.in_bounds(dest_x, dest_y):
             # Destination is out of bounds.
             raise exceptions.Impossible("That way is blocked.")
-        if not self.engine.game_map.tiles["walkable"][dest_x, dest_y]:
+        if not self.engine.game_map.is_walkable(dest_x, dest_y):
             # Destination is blocked by a tile.
             raise exceptions.Impossible("That way is blocked.")
         if self.engine.game_map.get_blocking_entity_at_location(dest_x, dest_y):
@@ -217,7 +199,7 @@ class MovementAction(ActionWithDirection):
             raise exceptions.Impossible("That way is blocked.")
 
         self.entity.fighter.actions_remaining -= 1
-        self.engine.message_log.add_message(f"{self.entity.name} has {self.entity.fighter.actions_remaining} actions remaining.")
+        self.engine.events.publish(ActionsRemaining(self.entity))
 
         self.entity.move(self.dx, self.dy)
 
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Benchmarks for the engine's hot paths.
+
+Every benchmark starts from a fixed seed and runs without a window.  The
+results are printed as JSON.  Use --save to keep them as a baseline and
+--baseline to compare a later run against it:
+
+    python benchmarks.py --save baseline.json
+    python benchmarks.py --baseline baseline.json
+
+Any benchmark whose median is slower than the baseline by more than the
+--threshold fraction is reported as a regression and the exit status is 1.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+import tcod
+
+import setup_game
+import tile_types
+
+if TYPE_CHECKING:
+    from engine import Engine
+
+SEED = 1234
+# The same size as the game's screen.
+SCREEN_WIDTH = 80
+SCREEN_HEIGHT = 50
+
+
+class Benchmark:
+    """A named benchmark, `setup` builds fresh state which `run` is timed on."""
+
+    def __init__(
+        self, name: str, setup: Callable[[], Any], run: Callable[[Any], Any]
+    ):
+        self.name = name
+        self.setup = setup
+        self.run = run
+
+    def measure(self, repeat: int) -> Dict[str, float]:
+        """Return timing statistics of `repeat` runs in milliseconds."""
+        samples: List[float] = []
+        for i in range(repeat):
+            random.seed(SEED + i)
+            state = self.setup()
+            start = time.perf_counter()
+            self.run(state)
+            samples.append((time.perf_counter() - start) * 1000)
+        return {
+            "min_ms": min(samples),
+            "median_ms": statistics.median(samples),
+            "mean_ms": statistics.mean(samples),
+            "repeat": repeat,
+        }
+
+
+def new_engine() -> Engine:
+    """Return a new game which is the same for the same random seed."""
+    return setup_game.new_game(SCREEN_WIDTH, SCREEN_HEIGHT)
+
+
+def spawn_monsters(engine: Engine, count: int) -> None:
+    """Spawn `count` awake orcs on random walkable tiles of the current map."""
+    import entity_factories
+
+    game_map = engine.game_map
+    floor_xy = np.argwhere(tile_types.palette["walkable"][game_map.tiles[:, :]])
+    occupied = {(entity.x, entity.y) for entity in game_map.entities}
+    for x, y in floor_xy[np.random.RandomState(SEED).permutation(len(floor_xy))]:
+        if count <= 0:
+            break
+        if (x, y) not in occupied:
+            game_map.wake(entity_factories.orc.spawn(game_map, int(x), int(y)))
+            count -= 1
+
+
+def get_benchmarks(monsters: int) -> List[Benchmark]:
+    from procgen import generate_dungeon
+    import entity_factories
+
+    def generate(engine: Engine) -> None:
+        world = engine.game_world
+        generate_dungeon(
+            max_rooms=world.max_rooms,
+            room_min_size=world.room_min_size,
+            room_max_size=world.room_max_size,
+            map_width=world.map_width,
+            map_height=world.map_height,
+            engine=engine,
+        )
+
+    def spawn(engine: Engine) -> None:
+        x, y = engine.player.x, engine.player.y
+        for _ in range(100):
+            entity_factories.orc.spawn(engine.game_map, x, y)
+
+    def find_path(engine: Engine) -> None:
+        x, y = engine.game_map.downstairs_location
+        engine.player.ai.get_path_to(x, y)
+
+    def crowded_engine() -> Engine:
+        engine = new_engine()
+        spawn_monsters(engine, monsters)
+        # Show the whole map, and have every monster head for the player.
+        engine.game_map.visible[:, :] = True
+        player = engine.player
+        for actor in engine.game_map.awake_actors:
+            actor.ai.hear_noise(player.x, player.y)
+        return engine
+
+    def render(engine: Engine) -> None:
+        engine.game_map.render(
+            tcod.Console(SCREEN_WIDTH, SCREEN_HEIGHT, order="F"), engine.camera
+        )
+
+    def save_and_load(engine: Engine) -> None:
+        filename = os.path.join(tempfile.gettempdir(), "benchmark.sav")
+        engine.save_as(filename)
+        setup_game.load_game(filename)
+        os.remove(filename)
+
+    return [
+        Benchmark("generate_dungeon", new_engine, generate),
+        Benchmark("spawn_100", new_engine, spawn),
+        Benchmark("update_fov", new_engine, lambda engine: engine.update_fov()),
+        Benchmark("get_path_to", new_engine, find_path),
+        Benchmark(
+            f"handle_enemy_turns_{monsters}",
+            crowded_engine,
+            lambda engine: engine.handle_enemy_turns(),
+        ),
+        Benchmark("render_map", crowded_engine, render),
+        Benchmark("save_and_load", crowded_engine, save_and_load),
+    ]
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Return a description of each benchmark which regressed from the baseline."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]["median_ms"]
+        new = result["median_ms"]
+        if new > old * (1 + threshold):
+            regressions.append(f"{name}: {old:.3f} ms -> {new:.3f} ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per benchmark.")
+    parser.add_argument("--monsters", type=int, default=200)
+    parser.add_argument("--filter", default="", help="Only run names with this text.")
+    parser.add_argument("--save", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Compare the results with this file.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="Allowed slowdown fraction."
+    )
+    args = parser.parse_args(argv)
+    save = args.save and os.path.abspath(args.save)
+    baseline = args.baseline and os.path.abspath(args.baseline)
+
+    # Games write their message history beside the save, keep it out of the way.
+    os.chdir(tempfile.mkdtemp())
+
+    results = {
+        benchmark.name: benchmark.measure(args.repeat)
+        for benchmark in get_benchmarks(args.monsters)
+        if args.filter in benchmark.name
+    }
+    report = {
+        "seed": SEED,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+
+    if save:
+        with open(save, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
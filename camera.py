@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+
+class Camera:
+    """The part of a map which is shown on the screen.
+
+    `x` and `y` are the map coordinates of the top left corner of the view.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.x = 0
+        self.y = 0
+
+    def center_on(self, x: int, y: int, map_width: int, map_height: int) -> None:
+        """Center the view on `x`, `y` without showing anything past the map edges."""
+        self.x = max(0, min(x - self.width // 2, map_width - self.width))
+        self.y = max(0, min(y - self.height // 2, map_height - self.height))
+
+    def map_to_screen(self, x: int, y: int) -> Tuple[int, int]:
+        return x - self.x, y - self.y
+
+    def screen_to_map(self, x: int, y: int) -> Tuple[int, int]:
+        return x + self.x, y + self.y
+
+    def in_view(self, x: int, y: int) -> bool:
+        """Return True if the map position `x`, `y` is on the screen."""
+        return (
+            self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+        )
+
+    def get_views(
+        self, map_width: int, map_height: int
+    ) -> Tuple[Tuple[slice, slice], Tuple[slice, slice]]:
+        """Return the screen slices and the map slices of the visible part of a map.
+
+        Both are the same shape, the view is smaller than the screen if the map is.
+        """
+        width = min(self.width, map_width - self.x)
+        height = min(self.height, map_height - self.y)
+        screen_view = slice(0, width), slice(0, height)
+        map_view = slice(self.x, self.x + width), slice(self.y, self.y + height)
+        return screen_view, map_view
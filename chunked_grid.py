@@ -0,0 +1,288 @@
+"""A 2D array which is split into chunks that are only allocated once written to."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+import zlib
+
+import numpy as np  # type: ignore
+
+CHUNK_SIZE = 32
+MAX_HOT_CHUNKS = 256  # Chunks past this many are compressed, least recently used first.
+
+ChunkKey = Tuple[int, int]
+Index = Tuple[Union[int, slice], Union[int, slice]]
+
+
+class ChunkedGrid:
+    """A `width` by `height` array stored as square chunks.
+
+    Indexing with two integers reads or writes a single element, indexing with
+    slices reads a copy of that area or writes to it.
+
+    A chunk is allocated by the first write to it.  Chunks which haven't been
+    written to are never allocated, reading them returns `fill_value`.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        dtype: Any,
+        fill_value: Any,
+        chunk_size: int = CHUNK_SIZE,
+        max_hot_chunks: int = MAX_HOT_CHUNKS,
+    ):
+        self.width, self.height = width, height
+        self.dtype = np.dtype(dtype)
+        self.fill_value = np.array(fill_value, dtype=self.dtype)
+        self.chunk_size = chunk_size
+        self.max_hot_chunks = max_hot_chunks
+
+        # Allocated chunks, the most recently used are last.
+        self.hot: OrderedDict[ChunkKey, np.ndarray] = OrderedDict()
+        # Chunks which haven't been used recently, compressed with zlib.
+        self.cold: Dict[ChunkKey, bytes] = {}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the allocated and compressed chunks."""
+        return sum(chunk.nbytes for chunk in self.hot.values()) + sum(
+            len(data) for data in self.cold.values()
+        )
+
+    def get_chunk(self, key: ChunkKey) -> Optional[np.ndarray]:
+        """Return the chunk at `key`, or None if nothing was ever written to it."""
+        chunk = self.hot.get(key)
+        if chunk is not None:
+            self.hot.move_to_end(key)
+            return chunk
+
+        if key not in self.cold:
+            return None
+
+        chunk = self.hot[key] = self.decompress_chunk(self.cold.pop(key))
+        self.compress_cold_chunks()
+        return chunk
+
+    def compress_cold_chunks(self) -> None:
+        """Compress the least recently used chunks past `max_hot_chunks`."""
+        while len(self.hot) > self.max_hot_chunks:
+            key, chunk = self.hot.popitem(last=False)
+            self.cold[key] = zlib.compress(chunk.tobytes(order="F"))
+
+    def decompress_chunk(self, data: bytes) -> np.ndarray:
+        chunk = self.new_chunk()
+        chunk[...] = np.frombuffer(zlib.decompress(data), chunk.dtype).reshape(
+            chunk.shape, order="F"
+        )
+        return chunk
+
+    def new_chunk(self) -> np.ndarray:
+        """Return a new chunk filled with `fill_value`."""
+        size = self.chunk_size
+        return np.full((size, size), self.fill_value, order="F")
+
+    def read_chunk(self, chunk: np.ndarray, index: Tuple[slice, slice]) -> np.ndarray:
+        """Return the elements at `index` of a chunk."""
+        return chunk[index]
+
+    def read_element(self, chunk: np.ndarray, x: int, y: int) -> Any:
+        return chunk[x, y]
+
+    def write_chunk(self, chunk: np.ndarray, index: Any, value: Any) -> None:
+        """Assign `value` to the elements at `index` of a chunk."""
+        chunk[index] = value
+
+    def get_slices(self, key: Index) -> Tuple[slice, slice]:
+        """Return `key` as a pair of bounded slices."""
+        x, y = key
+        if not isinstance(x, slice):
+            x = slice(x, x + 1)
+        if not isinstance(y, slice):
+            y = slice(y, y + 1)
+        x_start, x_stop, x_step = x.indices(self.width)
+        y_start, y_stop, y_step = y.indices(self.height)
+        if x_step != 1 or y_step != 1:
+            raise IndexError("ChunkedGrid doesn't support slice steps.")
+        return (
+            slice(x_start, max(x_start, x_stop)),
+            slice(y_start, max(y_start, y_stop)),
+        )
+
+    def iter_chunks(
+        self, xs: slice, ys: slice
+    ) -> Iterator[Tuple[ChunkKey, Tuple[slice, slice], Tuple[slice, slice]]]:
+        """Yield the key of each chunk overlapping an area, and where they overlap.
+
+        Each overlap is given as slices of the area and slices of the chunk.
+        """
+        size = self.chunk_size
+        for cx in range(xs.start // size, (xs.stop + size - 1) // size):
+            x0 = max(xs.start, cx * size)
+            x1 = min(xs.stop, (cx + 1) * size)
+            for cy in range(ys.start // size, (ys.stop + size - 1) // size):
+                y0 = max(ys.start, cy * size)
+                y1 = min(ys.stop, (cy + 1) * size)
+                area_index = (
+                    slice(x0 - xs.start, x1 - xs.start),
+                    slice(y0 - ys.start, y1 - ys.start),
+                )
+                chunk_index = (
+                    slice(x0 - cx * size, x1 - cx * size),
+                    slice(y0 - cy * size, y1 - cy * size),
+                )
+                yield (cx, cy), area_index, chunk_index
+
+    def __getitem__(self, key: Index) -> Any:
+        x, y = key
+        if not isinstance(x, slice) and not isinstance(y, slice):
+            size = self.chunk_size
+            chunk = self.get_chunk((x // size, y // size))
+            if chunk is None:
+                return self.fill_value[()]
+            return self.read_element(chunk, x % size, y % size)
+
+        xs, ys = self.get_slices(key)
+        area = np.empty((xs.stop - xs.start, ys.stop - ys.start), self.dtype, order="F")
+        for chunk_key, area_index, chunk_index in self.iter_chunks(xs, ys):
+            chunk = self.get_chunk(chunk_key)
+            if chunk is None:
+                area[area_index] = self.fill_value
+            else:
+                area[area_index] = self.read_chunk(chunk, chunk_index)
+        if not isinstance(x, slice):
+            return area[0, :]
+        if not isinstance(y, slice):
+            return area[:, 0]
+        return area
+
+    def __setitem__(self, key: Index, value: Any) -> None:
+        x, y = key
+        if not isinstance(x, slice) and not isinstance(y, slice):
+            size = self.chunk_size
+            chunk = self.get_or_new_chunk((x // size, y // size))
+            self.write_chunk(chunk, (x % size, y % size), value)
+            return
+
+        xs, ys = self.get_slices(key)
+        value = np.asarray(value, dtype=self.dtype)
+        if value.ndim == 1 and not isinstance(key[1], slice):
+            value = value[:, np.newaxis]  # Writing to a single column.
+        if value.ndim:
+            value = np.broadcast_to(value, (xs.stop - xs.start, ys.stop - ys.start))
+        for chunk_key, area_index, chunk_index in self.iter_chunks(xs, ys):
+            part = value[area_index] if value.ndim else value
+            self.write_chunk(self.get_or_new_chunk(chunk_key), chunk_index, part)
+
+    def get_or_new_chunk(self, key: ChunkKey) -> np.ndarray:
+        chunk = self.get_chunk(key)
+        if chunk is None:
+            chunk = self.hot[key] = self.new_chunk()
+            self.compress_cold_chunks()
+        return chunk
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle every chunk compressed, they're decompressed again when read."""
+        state = self.__dict__.copy()
+        state["hot"] = OrderedDict()
+        state["cold"] = {
+            key: zlib.compress(chunk.tobytes(order="F"))
+            for key, chunk in self.hot.items()
+        }
+        state["cold"].update(self.cold)
+        return state
+
+
+class BitGrid(ChunkedGrid):
+    """A ChunkedGrid of booleans with every chunk packed into bits.
+
+    Chunks are packed along the y axis, eight cells to a byte, which uses an
+    eighth of the memory of a bool array.  Chunks are unpacked only for slice
+    access, single cells are read and written with bit operations.  When
+    pickled each chunk is run-length encoded.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        fill_value: bool = False,
+        chunk_size: int = CHUNK_SIZE,
+        max_hot_chunks: int = MAX_HOT_CHUNKS,
+    ):
+        if chunk_size % 8:
+            raise ValueError("The chunk size of a BitGrid must be a multiple of 8.")
+        super().__init__(width, height, bool, fill_value, chunk_size, max_hot_chunks)
+
+    def new_chunk(self) -> np.ndarray:
+        size = self.chunk_size
+        fill_byte = 0xFF if self.fill_value else 0
+        return np.full((size, size // 8), fill_byte, dtype=np.uint8, order="F")
+
+    def unpack_chunk(self, chunk: np.ndarray) -> np.ndarray:
+        return np.unpackbits(chunk, axis=1).view(bool)
+
+    def read_chunk(self, chunk: np.ndarray, index: Tuple[slice, slice]) -> np.ndarray:
+        return self.unpack_chunk(chunk)[index]
+
+    def read_element(self, chunk: np.ndarray, x: int, y: int) -> bool:
+        return bool(int(chunk[x, y >> 3]) >> (7 - (y & 7)) & 1)
+
+    def write_chunk(self, chunk: np.ndarray, index: Any, value: Any) -> None:
+        x, y = index
+        if not isinstance(x, slice):
+            mask = 0x80 >> (y & 7)
+            if value:
+                chunk[x, y >> 3] |= mask
+            else:
+                chunk[x, y >> 3] &= ~mask & 0xFF
+            return
+        bits = self.unpack_chunk(chunk)
+        bits[index] = value
+        chunk[...] = np.packbits(bits, axis=1)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        chunks = list(self.hot.items()) + [
+            (key, self.decompress_chunk(data)) for key, data in self.cold.items()
+        ]
+        state["hot"] = OrderedDict()
+        state["cold"] = {}
+        state["runs"] = {
+            key: run_length_encode(self.unpack_chunk(chunk)).tobytes()
+            for key, chunk in chunks
+        }
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        runs = state.pop("runs")
+        self.__dict__.update(state)
+        shape = self.chunk_size, self.chunk_size
+        for key, data in runs.items():
+            bits = run_length_decode(np.frombuffer(data, np.uint16), shape)
+            self.hot[key] = np.packbits(bits, axis=1)
+        self.compress_cold_chunks()
+
+
+def run_length_encode(bits: np.ndarray) -> np.ndarray:
+    """Return the lengths of the alternating runs of False and True in `bits`.
+
+    The first run is of False and may be empty.  Runs are limited to uint16.
+    """
+    flat = bits.ravel(order="F")
+    edges = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    runs = np.diff(np.concatenate(([0], edges, [flat.size])))
+    if flat.size and flat[0]:
+        runs = np.concatenate(([0], runs))
+    return runs.astype(np.uint16)
+
+
+def run_length_decode(runs: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    """Return the bool array of `shape` which was encoded by `run_length_encode`."""
+    values = np.arange(len(runs)) % 2 == 1
+    return np.repeat(values, runs).reshape(shape, order="F")
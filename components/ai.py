@@ -7,43 +7,84 @@ import numpy as np  # type: ignore
 import tcod
 
 from actions import Action, BumpAction, MeleeAction, MovementAction, WaitAction
+from events import ConfusionEnded
+import tile_types
 
 if TYPE_CHECKING:
     from entity import Actor
 
+PATH_MARGIN = 16  # How far around the start and end of a path is searched first.
+# The largest area which is searched again with a wider margin, in tiles.
+MAX_PATH_AREA = 128 * 128
+
 
 class BaseAI(Action):
     def perform(self) -> None:
         raise NotImplementedError()
 
+    def hear_noise(self, x: int, y: int) -> None:
+        """Called when a noise at `x`, `y` wakes this actor.  Ignored by default."""
+
     def get_path_to(self, dest_x: int, dest_y: int) -> List[Tuple[int, int]]:
         """Compute and return a path to the target position.
 
         If there is no valid path then returns an empty list.
         """
+        game_map = self.entity.gamemap
+        # Search the area around both ends of the path, most paths don't go further
+        # around than PATH_MARGIN tiles.  If there's no path the margin is doubled
+        # until the area would be larger than MAX_PATH_AREA, so that a path which
+        # can't be found doesn't read the chunks of the whole map every turn.
+        margin = PATH_MARGIN
+        while True:
+            x0 = max(0, min(self.entity.x, dest_x) - margin)
+            y0 = max(0, min(self.entity.y, dest_y) - margin)
+            x1 = min(game_map.width, max(self.entity.x, dest_x) + margin + 1)
+            y1 = min(game_map.height, max(self.entity.y, dest_y) + margin + 1)
+            path = self.get_path_in_rect(dest_x, dest_y, x0, y0, x1, y1)
+            if path or (x0, y0, x1, y1) == (0, 0, game_map.width, game_map.height):
+                return path
+
+            margin *= 2
+            width = min(game_map.width, abs(self.entity.x - dest_x) + 2 * margin + 1)
+            height = min(game_map.height, abs(self.entity.y - dest_y) + 2 * margin + 1)
+            if width * height > MAX_PATH_AREA:
+                return []
+
+    def get_path_in_rect(
+        self, dest_x: int, dest_y: int, x0: int, y0: int, x1: int, y1: int
+    ) -> List[Tuple[int, int]]:
+        """Return a path to the target position which stays inside of the given
+        rectangle, or an empty list if there isn't one.
+        """
+        game_map = self.entity.gamemap
+
         # Copy the walkable array.
-        cost = np.array(self.entity.gamemap.tiles["walkable"], dtype=np.int8)
+        cost = np.array(
+            tile_types.palette["walkable"][game_map.tiles[x0:x1, y0:y1]], dtype=np.int8
+        )
 
-        for entity in self.entity.gamemap.entities:
+        for entity in game_map.entity_index.in_rect(x0, y0, x1, y1):
             # Check that an enitiy blocks movement and the cost isn't zero (blocking.)
-            if entity.blocks_movement and cost[entity.x, entity.y]:
+            if entity.blocks_movement and cost[entity.x - x0, entity.y - y0]:
                 # Add to the cost of a blocked position.
                 # A lower number means more enemies will crowd behind each other in
                 # hallways.  A higher number means enemies will take longer paths in
                 # order to surround the player.
-                cost[entity.x, entity.y] += 10
+                cost[entity.x - x0, entity.y - y0] += 10
 
         # Create a graph from the cost array and pass that graph to a new pathfinder.
         graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=3)
         pathfinder = tcod.path.Pathfinder(graph)
 
-        pathfinder.add_root((self.entity.x, self.entity.y))  # Start position.
+        pathfinder.add_root((self.entity.x - x0, self.entity.y - y0))  # Start position.
 
         # Compute the path to the destination and remove the starting point.
-        path: List[List[int]] = pathfinder.path_to((dest_x, dest_y))[1:].tolist()
+        path_to = pathfinder.path_to((dest_x - x0, dest_y - y0))
+        path: List[List[int]] = path_to[1:].tolist()
 
-        # Convert from List[List[int]] to List[Tuple[int, int]].
-        return [(index[0], index[1]) for index in path]
+        # Convert from List[List[int]] to List[Tuple[int, int]] in map coordinates.
+        return [(index[0] + x0, index[1] + y0) for index in path]
 
 
 class HostileEnemy(BaseAI):
@@ -57,20 +98,27 @@ class HostileEnemy(BaseAI):
         dy = target.y - self.entity.y
         distance = max(abs(dx), abs(dy))  # Chebyshev distance.
 
-        if self.engine.game_map.visible[self.entity.x, self.entity.y]:
+        if self.engine.perception.can_see_target(self.entity):
             if distance <= 1:
                 return MeleeAction(self.entity, dx, dy).perform()
 
             self.path = self.get_path_to(target.x, target.y)
 
-            if self.path:
-                dest_x, dest_y = self.path.pop(0)
-                return MovementAction(
-                    self.entity, dest_x - self.entity.x, dest_y - self.entity.y,
-                ).perform()
+        if self.path:
+            # Keep heading to the last place the player or a noise was noticed.
+            dest_x, dest_y = self.path.pop(0)
+            return MovementAction(
+                self.entity, dest_x - self.entity.x, dest_y - self.entity.y,
+            ).perform()
 
+        # Nothing left to chase, stop taking turns until something wakes us again.
+        self.engine.game_map.sleep(self.entity)
         return WaitAction(self.entity).perform()
 
+    def hear_noise(self, x: int, y: int) -> None:
+        """Go investigate the noise."""
+        self.path = self.get_path_to(x, y)
+
 
 class ConfusedEnemy(BaseAI):
     """
@@ -89,9 +137,7 @@ class ConfusedEnemy(BaseAI):
     def perform(self) -> None:
         # Revert the AI back to the original state if the effect has run its course.
         if self.turns_remaining <= 0:
-            self.engine.message_log.add_message(
-                f"The {self.entity.name} is no longer confused."
-            )
+            self.engine.events.publish(ConfusionEnded(self.entity))
             self.entity.ai = self.previous_ai
         else:
             # Pick a random direction
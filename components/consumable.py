@@ -7,15 +7,16 @@ import color
 import components.ai
 import components.inventory
 from components.base_component import BaseComponent
+import events
 from exceptions import Impossible
-from input_handlers import (
-    ActionOrHandler,
-    AreaRangedAttackHandler,
-    SingleRangedAttackHandler,
-)
 
 if TYPE_CHECKING:
     from entity import Actor, Item
+    from input_handlers import (
+        ActionOrHandler,
+        AreaRangedAttackHandler,
+        SingleRangedAttackHandler,
+    )
 
 
 class Consumable(BaseComponent):
@@ -33,11 +34,11 @@ class Consumable(BaseComponent):
         raise NotImplementedError()
 
     def consume(self) -> None:
-        """Remove the consumed item from its containing inventory."""
+        """Remove one of the consumed item from its containing inventory."""
         entity = self.parent
         inventory = entity.parent
         if isinstance(inventory, components.inventory.Inventory):
-            inventory.items.remove(entity)
+            inventory.remove(entity)
 
 
 class ConfusionConsumable(Consumable):
@@ -45,6 +46,8 @@ class ConfusionConsumable(Consumable):
         self.number_of_turns = number_of_turns
 
     def get_action(self, consumer: Actor) -> SingleRangedAttackHandler:
+        from input_handlers import SingleRangedAttackHandler
+
         self.engine.message_log.add_message(
             "Select a target location.", color.needs_target
         )
@@ -64,10 +67,7 @@ class ConfusionConsumable(Consumable):
         if target is consumer:
             raise Impossible("You cannot confuse yourself!")
 
-        self.engine.message_log.add_message(
-            f"The eyes of the {target.name} look vacant, as it starts to stumble around!",
-            color.status_effect_applied,
-        )
+        self.engine.events.publish(events.Confused(target))
         target.ai = components.ai.ConfusedEnemy(
             entity=target, previous_ai=target.ai, turns_remaining=self.number_of_turns,
         )
@@ -80,6 +80,8 @@ class FireballDamageConsumable(Consumable):
         self.radius = radius
 
     def get_action(self, consumer: Actor) -> AreaRangedAttackHandler:
+        from input_handlers import AreaRangedAttackHandler
+
         self.engine.message_log.add_message(
             "Select a target location.", color.needs_target
         )
@@ -95,17 +97,13 @@ class FireballDamageConsumable(Consumable):
         if not self.engine.game_map.visible[target_xy]:
             raise Impossible("You cannot target an area that you cannot see.")
 
-        targets_hit = False
-        for actor in self.engine.game_map.actors:
-            if actor.distance(*target_xy) <= self.radius:
-                self.engine.message_log.add_message(
-                    f"The {actor.name} is engulfed in a fiery explosion, taking {self.damage} damage!"
-                )
-                actor.fighter.take_damage(self.damage)
-                targets_hit = True
-
-        if not targets_hit:
+        targets = self.engine.game_map.get_actors_in_radius(*target_xy, self.radius)
+        if not targets:
             raise Impossible("There are no targets in the radius.")
+
+        for actor in targets:
+            self.engine.events.publish(events.Engulfed(actor, self.damage))
+            actor.fighter.take_damage(self.damage)
         self.consume()
 
 
@@ -118,9 +116,8 @@ class HealingConsumable(Consumable):
         amount_recovered = consumer.fighter.heal(self.amount)
 
         if amount_recovered > 0:
-            self.engine.message_log.add_message(
-                f"You consume the {self.parent.name}, and recover {amount_recovered} HP!",
-                color.health_recovered,
+            self.engine.events.publish(
+                events.Healed(consumer, self.parent.name, amount_recovered)
             )
             self.consume()
         else:
@@ -134,21 +131,20 @@ class LightningDamageConsumable(Consumable):
 
     def activate(self, action: actions.ItemAction) -> None:
         consumer = action.entity
-        target = None
-        closest_distance = self.maximum_range + 1.0
-
-        for actor in self.engine.game_map.actors:
-            if actor is not consumer and self.parent.gamemap.visible[actor.x, actor.y]:
-                distance = consumer.distance(actor.x, actor.y)
-
-                if distance < closest_distance:
-                    target = actor
-                    closest_distance = distance
+        game_map = self.engine.game_map
+        targets = game_map.get_nearest_actors(
+            consumer.x,
+            consumer.y,
+            k=1,
+            max_distance=self.maximum_range + 1.0,
+            condition=lambda actor: actor is not consumer
+            and game_map.visible[actor.x, actor.y],
+            inclusive=False,
+        )
+        target = targets[0] if targets else None
 
         if target:
-            self.engine.message_log.add_message(
-                f"A lighting bolt strikes the {target.name} with a loud thunder, for {self.damage} damage!"
-            )
+            self.engine.events.publish(events.LightningStruck(target, self.damage))
             target.fighter.take_damage(self.damage)
             self.consume()
         else:
@@ -3,7 +3,9 @@ from __future__ import annotations
 from typing import Optional, TYPE_CHECKING
 
 from components.base_component import BaseComponent
+from components.equippable import Equippable, Fists
 from equipment_types import EquipmentType
+from traits import Rune, Trait
 
 if TYPE_CHECKING:
     from entity import Actor, Item
@@ -17,28 +19,30 @@ class Equipment(BaseComponent):
         self.armor = armor
 
     @property
-    def ac_bonus(self) -> int:
-        bonus = 0
-
+    def weapon_equippable(self) -> Equippable:
+        """The equippable of the wielded weapon, or fists if there's no weapon."""
         if self.weapon is not None and self.weapon.equippable is not None:
-            bonus += self.weapon.equippable.ac_bonus
-
-        if self.armor is not None and self.armor.equippable is not None:
-            bonus += self.armor.equippable.ac_bonus
-
-        return bonus
+            return self.weapon.equippable
+        return Fists()
 
     @property
-    def power_bonus(self) -> int:
-        bonus = 0
-
-        if self.weapon is not None and self.weapon.equippable is not None:
-            bonus += self.weapon.equippable.power_bonus
+    def weapon_traits(self) -> Trait:
+        if self.weapon is not None:
+            return self.weapon.traits
+        return Fists.traits
 
-        if self.armor is not None and self.armor.equippable is not None:
-            bonus += self.armor.equippable.power_bonus
-
-        return bonus
+    @property
+    def weapon_runes(self) -> Rune:
+        if self.weapon is not None:
+            return self.weapon.runes
+        return Rune(0)
+
+    def add_modifiers(self) -> None:
+        """Apply the modifiers of the items which are equipped to begin with."""
+        for item in (self.weapon, self.armor):
+            if item is not None and item.equippable is not None:
+                for modifier in item.equippable.get_modifiers():
+                    self.parent.fighter.add_modifier(modifier)
 
     def item_is_equipped(self, item: Item) -> bool:
         return self.weapon == item or self.armor == item
@@ -61,6 +65,12 @@ class Equipment(BaseComponent):
 
         setattr(self, slot, item)
 
+        if item.equippable is not None:
+            for modifier in item.equippable.get_modifiers():
+                self.parent.fighter.add_modifier(modifier)
+        # The weapon's dice and traits change the stats too, modifiers or not.
+        self.parent.fighter.invalidate_stats()
+
         if add_message:
             self.equip_message(item.name)
 
@@ -72,6 +82,9 @@ class Equipment(BaseComponent):
 
         setattr(self, slot, None)
 
+        self.parent.fighter.remove_modifiers(current_item)
+        self.parent.fighter.invalidate_stats()
+
     def toggle_equip(self, equippable_item: Item, add_message: bool = True) -> None:
         if (
             equippable_item.equippable
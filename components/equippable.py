@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import List, TYPE_CHECKING
 
 from components.base_component import BaseComponent
 from equipment_types import EquipmentType
+import modifiers
+from modifiers import BonusType, Modifier
+from traits import Rune, Trait
 
 if TYPE_CHECKING:
     from entity import Item
@@ -35,23 +38,29 @@ class Equippable(BaseComponent):
         self.dice_size = kwargs.get("dice_size", 4)
         self.dice_number = kwargs.get("dice_number", 1)
         self.damage_type = kwargs.get("damage_type", "bludgeoning")
+        self.ac_bonus = kwargs.get("ac_bonus", 0)
 
-
-class Dagger(Equippable):
-    def __init__(self) -> None:
-        super().__init__(equipment_type=EquipmentType.WEAPON, damage_type = "slashing")
-
-
-class Sword(Equippable):
-    def __init__(self) -> None:
-        super().__init__(equipment_type=EquipmentType.WEAPON, dice_size = 6, damage_type = "slashing")
+    def get_modifiers(self) -> List[Modifier]:
+        """Return the modifiers this gives to whoever has it equipped."""
+        item_modifiers = []
+        runes = self.parent.runes
+        # Potency runes add to the item bonus of the item they're etched into.
+        ac_bonus = self.ac_bonus + (1 if runes & Rune.ARMOR_POTENCY else 0)
+        if ac_bonus:
+            item_modifiers.append(
+                Modifier(modifiers.AC, ac_bonus, BonusType.ITEM, self.parent)
+            )
+        if runes & Rune.WEAPON_POTENCY:
+            item_modifiers.append(
+                Modifier(modifiers.ATTACK, 1, BonusType.ITEM, self.parent)
+            )
+        return item_modifiers
 
 
-class LeatherArmor(Equippable):
-    def __init__(self) -> None:
-        super().__init__(equipment_type=EquipmentType.ARMOR, ac_bonus = 1)
+class Fists(Equippable):
+    """What an actor without a weapon attacks with."""
 
+    traits = Trait.AGILE | Trait.FINESSE | Trait.UNARMED | Trait.NONLETHAL
 
-class ChainMail(Equippable):
     def __init__(self) -> None:
-        super().__init__(equipment_type=EquipmentType.ARMOR, ac_bonus = 4)
+        super().__init__(equipment_type=EquipmentType.WEAPON)
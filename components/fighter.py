@@ -1,15 +1,33 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import Any, NamedTuple, Optional, TYPE_CHECKING
 
-import color
 from components.base_component import BaseComponent
+from events import Died
+import modifiers
+from modifiers import Modifier, ModifierRegistry
 from render_order import RenderOrder
+from traits import Rune, Trait
 
 if TYPE_CHECKING:
     from entity import Actor
 
 
+def ability_mod(score: int) -> int:
+    return (score - 10) // 2
+
+
+class CombatStats(NamedTuple):
+    """The numbers an attack needs, derived from ability scores and modifiers."""
+
+    ac: int
+    attack_bonus: int
+    dice_number: int
+    dice_size: int
+    damage_bonus: int
+    damage_type: str
+
+
 class Fighter(BaseComponent):
     parent: Actor
 
@@ -27,6 +45,8 @@ class Fighter(BaseComponent):
         self.actions_remaining = self.apt
         #MOVEMENT
         self.move_speed = kwargs.get('move_speed', 30)
+        #PERCEPTION
+        self.vision_radius = kwargs.get('vision_radius', 8)
         #ABILITY SCORES
         self._strength = kwargs.get('strength',10)
         self._dexterity = kwargs.get('dexterity',10)
@@ -35,15 +55,15 @@ class Fighter(BaseComponent):
         self._wisdom = kwargs.get('wisdom',10)
         self._charisma = kwargs.get('charisma',10)
         #ABILITY MODS
-        self.strength_mod = (self.strength - 10) // 2
-        self.dexterity_mod = (self.dexterity - 10) // 2
-        self.constitution_mod = (self.constitution - 10) // 2
-        self.intelligence_mod = (self.intelligence - 10) // 2
-        self.wisdom_mod = (self.wisdom - 10) // 2
-        self.charisma_mod = (self.charisma - 10) // 2
-        #ARMOR CLASS
-        self.ac = 10 + self.dexterity_mod #TODO : Properly implement armor bonus to AC
-
+        self.strength_mod = ability_mod(self.strength)
+        self.dexterity_mod = ability_mod(self.dexterity)
+        self.constitution_mod = ability_mod(self.constitution)
+        self.intelligence_mod = ability_mod(self.intelligence)
+        self.wisdom_mod = ability_mod(self.wisdom)
+        self.charisma_mod = ability_mod(self.charisma)
+        #COMBAT STATS
+        self.modifiers = ModifierRegistry()
+        self._stats: Optional[CombatStats] = None  # Computed when first needed.
 
 
     @property
@@ -73,32 +93,38 @@ class Fighter(BaseComponent):
     @strength.setter
     def strength(self, value : int) -> None:
         self._strength = max(0, value)
-        self.strength_mod = (self._strength - 10) / 2
+        self.strength_mod = ability_mod(self._strength)
+        self.invalidate_stats()
 
     @dexterity.setter
     def dexterity(self, value : int) -> None:
         self._dexterity = max(0, value)
-        self.dexterity_mod = (self._dexterity - 10) / 2
+        self.dexterity_mod = ability_mod(self._dexterity)
+        self.invalidate_stats()
 
     @constitution.setter
     def constitution(self, value : int) -> None:
         self._constitution = max(0, value)
-        self.constitution_mod = (self._constitution - 10) / 2
+        self.constitution_mod = ability_mod(self._constitution)
+        self.invalidate_stats()
 
     @intelligence.setter
     def intelligence(self, value : int) -> None:
         self._intelligence = max(0, value)
-        self.intelligence_mod = (self._intelligence - 10) / 2
+        self.intelligence_mod = ability_mod(self._intelligence)
+        self.invalidate_stats()
 
     @wisdom.setter
     def wisdom(self, value : int) -> None:
         self._wisdom = max(0, value)
-        self.wisdom_mod = (self._wisdom - 10) / 2
+        self.wisdom_mod = ability_mod(self._wisdom)
+        self.invalidate_stats()
 
     @charisma.setter
     def charisma(self, value : int) -> None:
         self._charisma = max(0, value)
-        self.charisma_mod = (self._charisma - 10) / 2
+        self.charisma_mod = ability_mod(self._charisma)
+        self.invalidate_stats()
 
     @property
     def hp(self) -> int:
@@ -111,34 +137,60 @@ class Fighter(BaseComponent):
             self.die()
 
     @property
-    def defense(self) -> int:
-        return self.defense_bonus
+    def stats(self) -> CombatStats:
+        """The derived combat stats, only recomputed after `invalidate_stats`."""
+        if self._stats is None:
+            self._stats = self.compute_stats()
+        return self._stats
 
     @property
-    def power(self) -> int:
-        return self.power_bonus
+    def ac(self) -> int:
+        return self.stats.ac
 
     @property
-    def defense_bonus(self) -> int:
-        if self.parent.equipment:
-            return self.parent.equipment.defense_bonus
-        else:
-            return 0
-
-    @property
-    def power_bonus(self) -> int:
-        if self.parent.equipment:
-            return self.parent.equipment.power_bonus
-        else:
-            return 0
+    def attack_bonus(self) -> int:
+        return self.stats.attack_bonus
+
+    def invalidate_stats(self) -> None:
+        """Called when anything the combat stats are derived from changes."""
+        self._stats = None
+
+    def compute_stats(self) -> CombatStats:
+        equipment = self.parent.equipment
+        weapon = equipment.weapon_equippable
+        attack_mod = self.strength_mod
+        if equipment.weapon_traits & Trait.FINESSE:
+            attack_mod = max(attack_mod, self.dexterity_mod)
+        dice_number = weapon.dice_number
+        if equipment.weapon_runes & Rune.STRIKING:
+            dice_number += 1
+        return CombatStats(
+            ac=10 + self.dexterity_mod + self.modifiers.total(modifiers.AC),
+            attack_bonus=attack_mod + self.modifiers.total(modifiers.ATTACK),
+            dice_number=dice_number,
+            dice_size=weapon.dice_size,
+            damage_bonus=self.strength_mod + self.modifiers.total(modifiers.DAMAGE),
+            damage_type=weapon.damage_type,
+        )
+
+    def add_modifier(self, modifier: Modifier) -> None:
+        # Only timed modifiers need the turn, prototypes aren't on a map yet.
+        turn = self.engine.turn if modifier.duration is not None else 0
+        self.modifiers.add(modifier, turn)
+        self.invalidate_stats()
+
+    def remove_modifiers(self, source: Any) -> None:
+        """Remove every modifier which was applied by `source`."""
+        if self.modifiers.remove_source(source):
+            self.invalidate_stats()
+
+    def end_turn(self) -> None:
+        """Remove this fighter's modifiers which have run out."""
+        if self.modifiers.expire(self.engine.turn):
+            self.invalidate_stats()
 
     def die(self) -> None:
-        if self.engine.player is self.parent:
-            death_message = "You died!"
-            death_message_color = color.player_die
-        else:
-            death_message = f"{self.parent.name} is dead!"
-            death_message_color = color.enemy_die
+        self.engine.events.publish(Died(self.parent))
 
         self.parent.char = "%"
         self.parent.color = (191, 0, 0)
@@ -146,8 +198,9 @@ class Fighter(BaseComponent):
         self.parent.ai = None
         self.parent.name = f"remains of {self.parent.name}"
         self.parent.render_order = RenderOrder.CORPSE
-
-        self.engine.message_log.add_message(death_message, death_message_color)
+        self.gamemap.unschedule(self.parent)
+        if self.engine.player is not self.parent:
+            self.gamemap.add_corpse(self.parent)
 
         self.engine.player.level.add_xp(self.parent.level.xp_given)
 
@@ -167,4 +220,5 @@ class Fighter(BaseComponent):
         return amount_recovered
 
     def take_damage(self, amount: int) -> None:
+        self.gamemap.wake(self.parent)  # Getting hurt always wakes an actor up.
         self.hp -= amount
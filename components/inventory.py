@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, TYPE_CHECKING
+from typing import Dict, List, TYPE_CHECKING
 
 from components.base_component import BaseComponent
 
@@ -14,12 +14,67 @@ class Inventory(BaseComponent):
     def __init__(self, capacity: int):
         self.capacity = capacity
         self.items: List[Item] = []
+        # The stack of each kind of stackable item, so it's found without a search.
+        self.stacks: Dict[str, Item] = {}
 
-    def drop(self, item: Item) -> None:
+    def can_add(self, item: Item) -> bool:
+        """Return True if there is room for `item`.  Adding to a stack needs none."""
+        return item.stack_key in self.stacks or len(self.items) < self.capacity
+
+    def add(self, item: Item) -> Item:
+        """Add `item` to this inventory and return the stack it was added to.
+
+        If there's already a stack of the same kind then `item` isn't kept.
         """
-        Removes an item from the inventory and restores it to the game map, at the player's current location.
+        key = item.stack_key
+        stack = self.stacks.get(key) if key is not None else None
+        if stack is not None:
+            stack.quantity += item.quantity
+            return stack
+
+        item.parent = self
+        self.items.append(item)
+        if key is not None:
+            self.stacks[key] = item
+        return item
+
+    def remove(self, item: Item, quantity: int = 1) -> None:
+        """Remove `quantity` of `item` from this inventory, such as when it's used.
+
+        Only the stack's quantity changes unless it's all removed.
         """
+        if quantity < item.quantity:
+            item.quantity -= quantity
+            return
+
         self.items.remove(item)
-        item.place(self.parent.x, self.parent.y, self.gamemap)
+        if item.stack_key is not None and self.stacks.get(item.stack_key) is item:
+            del self.stacks[item.stack_key]
+
+    def take(self, item: Item, quantity: int = 1) -> Item:
+        """Take `quantity` of `item` out of this inventory and return them.
+
+        A new item is split off the stack unless it's all taken.
+        """
+        if quantity < item.quantity:
+            return item.split(quantity)
+        self.remove(item, quantity)
+        return item
+
+    def drop(self, item: Item) -> None:
+        """
+        Removes one of an item from the inventory and restores it to the game map, at the player's current location.
+        """
+        dropped = self.take(item)
+
+        # Drop it onto a stack of the same kind if there's one here already.
+        for floor_item in self.gamemap.get_items_at_location(
+            self.parent.x, self.parent.y
+        ):
+            if dropped.stack_key and floor_item.stack_key == dropped.stack_key:
+                floor_item.quantity += dropped.quantity
+                break
+        else:
+            dropped.place(self.parent.x, self.parent.y, self.gamemap)
 
         self.engine.message_log.add_message(f"You dropped the {item.name}.")
@@ -51,6 +51,8 @@ class Level(BaseComponent):
 
         self.current_level += 1
 
+        self.parent.fighter.invalidate_stats()
+
     def increase_max_hp(self, amount: int = 20) -> None:
         self.parent.fighter.max_hp += amount
         self.parent.fighter.hp += amount
@@ -59,15 +61,15 @@ class Level(BaseComponent):
 
         self.increase_level()
 
-    def increase_power(self, amount: int = 1) -> None:
-        self.parent.fighter.base_power += amount
+    def increase_power(self, amount: int = 2) -> None:
+        self.parent.fighter.strength += amount
 
         self.engine.message_log.add_message("You feel stronger!")
 
         self.increase_level()
 
-    def increase_defense(self, amount: int = 1) -> None:
-        self.parent.fighter.base_defense += amount
+    def increase_defense(self, amount: int = 2) -> None:
+        self.parent.fighter.dexterity += amount
 
         self.engine.message_log.add_message("Your movements are getting swifter!")
 
@@ -0,0 +1,90 @@
+"""Reusable off-screen consoles for overlays and static art which rarely change."""
+from __future__ import annotations
+
+import os
+from typing import Callable, Dict, Hashable
+
+import numpy as np  # type: ignore
+import tcod
+
+
+class ConsolePool:
+    """Hands out off-screen consoles by key instead of allocating new ones every frame.
+
+    Consoles returned by `get_cached` keep their contents between frames and are
+    only redrawn when the version they were drawn for changes.
+    """
+
+    def __init__(self) -> None:
+        self.consoles: Dict[Hashable, tcod.Console] = {}
+        self.versions: Dict[Hashable, Hashable] = {}
+
+    def get(self, key: Hashable, width: int, height: int) -> tcod.Console:
+        """Return the console for `key`, a new console is only made if the size changed."""
+        console = self.consoles.get(key)
+        if console is None or console.width != width or console.height != height:
+            console = self.consoles[key] = tcod.Console(width, height, order="F")
+            self.invalidate(key)
+        return console
+
+    def get_cached(
+        self,
+        key: Hashable,
+        width: int,
+        height: int,
+        version: Hashable,
+        draw: Callable[[tcod.Console], None],
+    ) -> tcod.Console:
+        """Return the console for `key` after making sure it shows `version`.
+
+        `draw` is called on a cleared console only when `version` differs from
+        the one it was last drawn with.
+        """
+        console = self.get(key, width, height)
+        if key not in self.versions or self.versions[key] != version:
+            console.clear()
+            draw(console)
+            self.versions[key] = version
+        return console
+
+    def invalidate(self, key: Hashable) -> None:
+        """Force the console for `key` to be redrawn the next time it's used."""
+        self.versions.pop(key, None)
+
+    def get_static_art(self, filename: str, width: int, height: int) -> tcod.Console:
+        """Return a console with the image `filename` drawn on it as semigraphics.
+
+        This is for static full-screen art, the image is only converted once.
+        """
+        return self.get_cached(
+            ("art", filename),
+            width,
+            height,
+            filename,
+            lambda console: draw_static_art(console, filename),
+        )
+
+
+def draw_static_art(console: tcod.Console, filename: str) -> None:
+    """Draw the image `filename` onto `console` as semigraphics.
+
+    The converted tiles are cached on disk beside the image and reused until the
+    image is modified.
+    """
+    cache_filename = f"{filename}.{console.width}x{console.height}.npy"
+    try:
+        if os.path.getmtime(cache_filename) >= os.path.getmtime(filename):
+            console.tiles_rgb[...] = np.load(cache_filename)
+            return
+    except (OSError, ValueError):
+        pass  # The cache is missing or unreadable, convert the image again.
+
+    # Load the image and remove the alpha channel.
+    console.draw_semigraphics(tcod.image.load(filename)[:, :, :3], 0, 0)
+    try:
+        np.save(cache_filename, console.tiles_rgb)
+    except OSError:
+        pass  # The cache is optional.
+
+
+pool = ConsolePool()
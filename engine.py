@@ -2,14 +2,19 @@ from __future__ import annotations
 
 import lzma
 import pickle
-from typing import TYPE_CHECKING
+from typing import Tuple, TYPE_CHECKING
 
 from tcod.console import Console
 from tcod.map import compute_fov
 
+from camera import Camera
+from events import EventBus, GameEvent
 import exceptions
 from message_log import MessageLog
+from perception import Perception
+from profiler import profiler
 import render_functions
+import tile_types
 
 if TYPE_CHECKING:
     from entity import Actor
@@ -20,31 +25,74 @@ class Engine:
     game_map: GameMap
     game_world: GameWorld
 
-    def __init__(self, player: Actor):
+    def __init__(self, player: Actor, view_width: int, view_height: int):
         self.message_log = MessageLog()
-        self.mouse_location = (0, 0)
+        self.events = EventBus()
+        self.events.subscribe(self.log_event)
+        self._mouse_location = (0, 0)
         self.player = player
+        self.turn = 0  # The number of game turns which have passed.
+        # The view of the map, this is centered on the player once per turn.
+        self.camera = Camera(width=view_width, height=view_height)
+        self.perception = Perception()  # Which actors can see the player.
+        self.dirty = True  # True if something visible has changed since the last frame.
+
+    @property
+    def mouse_location(self) -> Tuple[int, int]:
+        return self._mouse_location
+
+    @mouse_location.setter
+    def mouse_location(self, value: Tuple[int, int]) -> None:
+        if value != self._mouse_location:
+            self._mouse_location = value
+            self.dirty = True
+
+    def log_event(self, event: GameEvent) -> None:
+        """Add the events which the player saw to the message log."""
+        if event.is_seen(self):
+            self.message_log.add_message(event.format(), event.fg)
 
     def handle_enemy_turns(self) -> None:
-        for entity in set(self.game_map.actors) - {self.player}:
+        self.turn += 1
+        self.perception.update(self.game_map, self.player, self.game_map.awake_actors)
+        # Dormant actors are skipped entirely, copy the awake set since actors can
+        # fall asleep or wake others during their turn.
+        for entity in list(self.game_map.awake_actors):
             if entity.ai:
                 try:
                     entity.ai.perform()
                 except exceptions.Impossible:
                     pass  # Ignore impossible action exceptions from AI.
+                entity.fighter.end_turn()
+        self.player.fighter.end_turn()
 
     def update_fov(self) -> None:
         """Recompute the visible area based on the players point of view."""
-        self.game_map.visible[:] = compute_fov(
-            self.game_map.tiles["transparent"],
-            (self.player.x, self.player.y),
-            radius=8,
+        game_map = self.game_map
+        x, y = self.player.x, self.player.y
+        radius = self.player.fighter.vision_radius
+        # Only the tiles within the radius are needed, not the whole map.
+        view = (
+            slice(max(0, x - radius), min(game_map.width, x + radius + 1)),
+            slice(max(0, y - radius), min(game_map.height, y + radius + 1)),
         )
+        visible = compute_fov(
+            tile_types.palette["transparent"][game_map.tiles[view]],
+            (x - view[0].start, y - view[1].start),
+            radius=radius,
+        )
+        game_map.visible[game_map.visible_view] = False
+        game_map.visible[view] = visible
+        game_map.visible_view = view
         # If a tile is "visible" it should be added to "explored".
-        self.game_map.explored |= self.game_map.visible
+        game_map.explored[view] |= visible
+        # Anything the player can now see is woken up.
+        game_map.wake_visible()
+        self.camera.center_on(x, y, game_map.width, game_map.height)
+        self.dirty = True
 
     def render(self, console: Console) -> None:
-        self.game_map.render(console)
+        self.game_map.render(console, self.camera)
 
         self.message_log.render(console=console, x=21, y=45, width=40, height=5)
 
@@ -65,6 +113,9 @@ class Engine:
             console=console, x=21, y=44, engine=self
         )
 
+        if profiler.show_overlay:
+            profiler.render(console)
+
     def save_as(self, filename: str) -> None:
         """Save this Engine instance as a compressed file."""
         save_data = lzma.compress(pickle.dumps(self))
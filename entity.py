@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import copy
+import itertools
 import math
-from typing import Optional, Tuple, Type, TypeVar, TYPE_CHECKING, Union
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar, TYPE_CHECKING, Union
 
 from render_order import RenderOrder
+from traits import Rune, Trait
 
 if TYPE_CHECKING:
     from components.ai import BaseAI
@@ -18,6 +20,9 @@ if TYPE_CHECKING:
 
 T = TypeVar("T", bound="Entity")
 
+# Serial numbers for entities, see Entity.__hash__.
+uids = itertools.count()
+
 
 class Entity:
     """
@@ -25,6 +30,14 @@ class Entity:
     """
 
     parent: Union[GameMap, Inventory]
+    uid: int
+
+    def __new__(cls: Type[T], *args: Any, **kwargs: Any) -> T:
+        # Assigned here instead of in __init__ so that copies and unpickled
+        # entities get a new serial number before they're put in any sets.
+        self = super().__new__(cls)
+        self.uid = next(uids)
+        return self
 
     def __init__(
         self,
@@ -36,8 +49,8 @@ class Entity:
         name: str = "<Unnamed>",
         blocks_movement: bool = False,
         render_order: RenderOrder = RenderOrder.CORPSE,
-        traits: list = [],
-        runes: list = []
+        traits: Trait = Trait(0),
+        runes: Rune = Rune(0),
     ):
         self.x = x
         self.y = y
@@ -51,7 +64,17 @@ class Entity:
         if parent:
             # If parent isn't provided now then it will be set later.
             self.parent = parent
-            parent.entities.add(self)
+            parent.add_entity(self)
+
+    def __hash__(self) -> int:
+        # Hashing by serial number instead of memory address makes sets of
+        # entities iterate in the same order every run, which replays depend on.
+        return self.uid
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["uid"]  # Given a new one by __new__ when loaded.
+        return state
 
     @property
     def gamemap(self) -> GameMap:
@@ -63,7 +86,7 @@ class Entity:
         clone.x = x
         clone.y = y
         clone.parent = gamemap
-        gamemap.entities.add(clone)
+        gamemap.add_entity(clone)
         return clone
     
     def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
@@ -73,9 +96,11 @@ class Entity:
         if gamemap:
             if hasattr(self, "parent"):  # Possibly uninitialized.
                 if self.parent is self.gamemap:
-                    self.gamemap.entities.remove(self)
+                    self.gamemap.remove_entity(self)
             self.parent = gamemap
-            gamemap.entities.add(self)
+            gamemap.add_entity(self)
+        elif self.parent is self.gamemap:
+            self.gamemap.entity_index.update(self)
 
     def distance(self, x: int, y: int) -> float:
         """
@@ -87,6 +112,7 @@ class Entity:
         # Move the entity by a given amount
         self.x += dx
         self.y += dy
+        self.gamemap.entity_index.update(self)
 
 
 class Actor(Entity):
@@ -103,9 +129,8 @@ class Actor(Entity):
         fighter: Fighter,
         inventory: Inventory,
         level: Level,
-        traits: list = [],
-        runes: list = []
-        
+        traits: Trait = Trait(0),
+        runes: Rune = Rune(0),
     ):
         super().__init__(
             x=x,
@@ -133,6 +158,14 @@ class Actor(Entity):
         self.level = level
         self.level.parent = self
 
+        self.equipment.add_modifiers()
+
+    def spawn(self, gamemap: GameMap, x: int, y: int) -> Actor:
+        """Spawn a copy of this actor, it stays dormant until something wakes it."""
+        clone = super().spawn(gamemap, x, y)
+        gamemap.dormant_actors.add(clone)
+        return clone
+
     @property
     def is_alive(self) -> bool:
         """Returns True as long as this actor can perform actions."""
@@ -163,8 +196,8 @@ class Item(Entity):
         name: str = "<Unnamed>",
         consumable: Optional[Consumable] = None,
         equippable: Optional[Equippable] = None,
-        traits: list = [],
-        runes: list = [],
+        traits: Trait = Trait(0),
+        runes: Rune = Rune(0),
         **kwargs
     ):
         super().__init__(
@@ -182,7 +215,8 @@ class Item(Entity):
         self.item_level = kwargs.get("item_level", 0)
         self.dice_size = kwargs.get("dice_size", 1) #this is the y in XdY
         self.dice_number = kwargs.get("dice_number", 1) #this is the x in XdY
-        
+        self.quantity = kwargs.get("quantity", 1)  # How many are in this stack.
+
         self.consumable = consumable
 
         if self.consumable:
@@ -192,3 +226,18 @@ class Item(Entity):
 
         if self.equippable:
             self.equippable.parent = self
+
+    @property
+    def stack_key(self) -> Optional[str]:
+        """Items with the same key stack together, None if this item can't stack."""
+        if self.consumable is None or self.equippable is not None:
+            return None
+        return self.name
+
+    def split(self, quantity: int) -> Item:
+        """Take `quantity` items off of this stack and return them as a new stack."""
+        # The parent is shared instead of copied along with the item.
+        clone = copy.deepcopy(self, {id(self.parent): self.parent})
+        clone.quantity = quantity
+        self.quantity -= quantity
+        return clone
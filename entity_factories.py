@@ -1,89 +1,149 @@
-from components.ai import HostileEnemy
-from components import consumable, equippable
+"""The prototypes of every monster and item, defined in data/entities.json.
+
+The definitions are compiled into prototype entities once, and the result is
+pickled beside the data file.  The pickle is reused for as long as the data
+file's hash and SCHEMA_VERSION match, so starting a game skips parsing and
+building them.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, List, Tuple
+
+from components import ai, consumable
 from components.equipment import Equipment
+from components.equippable import Equippable
 from components.fighter import Fighter
 from components.inventory import Inventory
 from components.level import Level
-from entity import Actor, Item
+from entity import Actor, Entity, Item
+from equipment_types import EquipmentType
+from traits import Rune, Trait
 
+DATA_FILENAME = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "entities.json"
+)
+CACHE_FILENAME = f"{DATA_FILENAME}.cache"
+# Bump this when the compiler or the attributes of the pickled classes change, so
+# that caches of the old prototypes aren't loaded.
+SCHEMA_VERSION = 3
 
+SpawnTable = Dict[int, List[Tuple[Entity, int]]]
+Prototypes = Tuple[Dict[str, Actor], Dict[str, Item], SpawnTable, SpawnTable]
 
-player = Actor(
-    char="@",
-    color=(255, 255, 255),
-    name="Player",
-    ai_cls=HostileEnemy,
-    equipment=Equipment(),
-    fighter=Fighter(
-        hp=30, # # TODO:  Setup HP in pf2e way
-        strength=18, constitution=14, dexterity=14, wisdom=12, intelligence=10,charisma=10),
-    inventory=Inventory(capacity=26),
-    level=Level(level_up_base=1000),
-)
 
-orc = Actor(
-    char="o",
-    color=(63, 127, 63),
-    name="Orc",
-    ai_cls=HostileEnemy,
-    equipment=Equipment(weapon = equippable.Sword()),
-    fighter=Fighter(hp=10,
-        strength=16, constitution=16, dexterity=14, wisdom=12, intelligence= 8,charisma=10
-        ),
-    inventory=Inventory(capacity=0),
-    level=Level(xp_given=35),
-)
-goblin_pyro = Actor(
-    char="G",
-    color=(0, 127, 0),
-    name="Goblin Pyro",
-    ai_cls=HostileEnemy,
-    equipment=Equipment(),
-    fighter=Fighter(hp=16,
-                    strength=10, dexterity=18, constitution=14, wisdom=8, intelligence=10, charisma=16
-                    ),
-    inventory=Inventory(capacity=0),
-    level=Level(xp_given=100),
-)
+def compile_item(definition: Dict[str, Any]) -> Item:
+    consumable_component = None
+    if "consumable" in definition:
+        kwargs = dict(definition["consumable"])
+        consumable_component = getattr(consumable, kwargs.pop("type"))(**kwargs)
 
-confusion_scroll = Item(
-    char="~",
-    color=(207, 63, 255),
-    name="Confusion Scroll",
-    consumable=consumable.ConfusionConsumable(number_of_turns=10),
-)
-fireball_scroll = Item(
-    char="~",
-    color=(255, 0, 0),
-    name="Fireball Scroll",
-    consumable=consumable.FireballDamageConsumable(damage=12, radius=3),
-)
-health_potion = Item(
-    char="!",
-    color=(127, 0, 255),
-    name="Health Potion",
-    consumable=consumable.HealingConsumable(amount=4),
-)
-lightning_scroll = Item(
-    char="~",
-    color=(255, 255, 0),
-    name="Lightning Scroll",
-    consumable=consumable.LightningDamageConsumable(damage=20, maximum_range=5),
-)
+    equippable = None
+    if "equippable" in definition:
+        kwargs = dict(definition["equippable"])
+        equipment_type = EquipmentType[kwargs.pop("equipment_type").upper()]
+        equippable = Equippable(equipment_type, **kwargs)
 
-dagger = Item(
-    char="/", color=(0, 191, 255), name="Dagger", equippable=equippable.Dagger()
-)
+    return Item(
+        char=definition["char"],
+        color=tuple(definition["color"]),
+        name=definition["name"],
+        consumable=consumable_component,
+        equippable=equippable,
+        traits=Trait.from_names(definition.get("traits", [])),
+        runes=Rune.from_names(definition.get("runes", [])),
+    )
 
-sword = Item(char="/", color=(0, 191, 255), name="Sword", equippable=equippable.Sword())
 
-leather_armor = Item(
-    char="[",
-    color=(139, 69, 19),
-    name="Leather Armor",
-    equippable=equippable.LeatherArmor(),
-)
+def compile_actor(definition: Dict[str, Any], items: Dict[str, Item]) -> Actor:
+    """Return an actor, its equipment refers to the prototypes in `items` by key."""
+    equipment = {
+        slot: items[key] for slot, key in definition.get("equipment", {}).items()
+    }
+    return Actor(
+        char=definition["char"],
+        color=tuple(definition["color"]),
+        name=definition["name"],
+        ai_cls=getattr(ai, definition["ai"]),
+        equipment=Equipment(**equipment),
+        fighter=Fighter(**definition["fighter"]),
+        inventory=Inventory(**definition.get("inventory", {"capacity": 0})),
+        level=Level(**definition.get("level", {})),
+        traits=Trait.from_names(definition.get("traits", [])),
+        runes=Rune.from_names(definition.get("runes", [])),
+    )
 
-chain_mail = Item(
-    char="[", color=(139, 69, 19), name="Chain Mail", equippable=equippable.ChainMail()
-)
+
+def compile_spawn_table(
+    definitions: Dict[str, Dict[str, Any]], prototypes: Dict[str, Any]
+) -> SpawnTable:
+    """Return the spawn weights of `definitions` by the floor they start on."""
+    table: SpawnTable = {}
+    for key, definition in definitions.items():
+        for floor, weight in definition.get("spawn_weights", {}).items():
+            table.setdefault(int(floor), []).append((prototypes[key], weight))
+    return dict(sorted(table.items()))
+
+
+def compile_definitions(definitions: Dict[str, Any]) -> Prototypes:
+    items = {
+        key: compile_item(definition)
+        for key, definition in definitions["items"].items()
+    }
+    actors = {
+        key: compile_actor(definition, items)
+        for key, definition in definitions["actors"].items()
+    }
+    return (
+        actors,
+        items,
+        compile_spawn_table(definitions["items"], items),
+        compile_spawn_table(definitions["actors"], actors),
+    )
+
+
+def load_prototypes(
+    filename: str = DATA_FILENAME, cache_filename: str = CACHE_FILENAME
+) -> Prototypes:
+    """Return the compiled prototypes of `filename`, from the cache if it's current."""
+    with open(filename, "rb") as f:
+        data = f.read()
+    key = f"{SCHEMA_VERSION}:{hashlib.sha256(data).hexdigest()}"
+
+    try:
+        with open(cache_filename, "rb") as f:
+            if pickle.load(f) == key:
+                prototypes: Prototypes = pickle.load(f)
+                return prototypes
+    except Exception:
+        pass  # The cache is missing or unreadable, compile the data again.
+
+    prototypes = compile_definitions(json.loads(data))
+    try:
+        with open(f"{cache_filename}.tmp", "wb") as f:
+            pickle.dump(key, f)
+            pickle.dump(prototypes, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{cache_filename}.tmp", cache_filename)
+    except OSError:
+        pass  # The cache is optional.
+    return prototypes
+
+
+actors, items, item_chances, enemy_chances = load_prototypes()
+
+player = actors["player"]
+orc = actors["orc"]
+goblin_pyro = actors["goblin_pyro"]
+
+confusion_scroll = items["confusion_scroll"]
+fireball_scroll = items["fireball_scroll"]
+health_potion = items["health_potion"]
+lightning_scroll = items["lightning_scroll"]
+
+dagger = items["dagger"]
+sword = items["sword"]
+leather_armor = items["leather_armor"]
+chain_mail = items["chain_mail"]
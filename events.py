@@ -0,0 +1,183 @@
+"""Things which happen in the game, published to whoever is interested in them.
+
+Events only record what happened.  The text describing an event is formatted by
+the subscribers which need it, such as the message log, so an event which
+nobody shows to the player costs almost nothing.
+"""
+from __future__ import annotations
+
+from typing import Callable, List, Tuple, Type, TYPE_CHECKING
+
+import color
+
+if TYPE_CHECKING:
+    from engine import Engine
+    from entity import Actor
+
+Subscriber = Callable[["GameEvent"], None]
+
+
+class GameEvent:
+    """Something which happened at `x`, `y` on the map."""
+
+    fg: Tuple[int, int, int] = color.white
+
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+
+    def format(self) -> str:
+        """Return the text describing this event."""
+        raise NotImplementedError()
+
+    def is_seen(self, engine: Engine) -> bool:
+        """Return True if the player saw this event happen."""
+        return bool(engine.game_map.visible[self.x, self.y])
+
+
+class EventBus:
+    def __init__(self) -> None:
+        self.subscribers: List[Tuple[Type[GameEvent], Subscriber]] = []
+
+    def subscribe(
+        self, subscriber: Subscriber, event_type: Type[GameEvent] = GameEvent
+    ) -> None:
+        """Call `subscriber` with every published event of `event_type`."""
+        self.subscribers.append((event_type, subscriber))
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.subscribers = [
+            (event_type, other)
+            for event_type, other in self.subscribers
+            if other != subscriber
+        ]
+
+    def publish(self, event: GameEvent) -> None:
+        for event_type, subscriber in self.subscribers:
+            if isinstance(event, event_type):
+                subscriber(event)
+
+
+class AttackRolled(GameEvent):
+    def __init__(self, attacker: Actor, target: Actor, roll: int, ac: int, hits: bool):
+        super().__init__(target.x, target.y)
+        self.attacker = attacker.name
+        self.target = target.name
+        self.roll = roll
+        self.ac = ac
+        self.hits = hits
+        self.by_player = attacker is attacker.gamemap.engine.player
+        self.fg = color.player_atk if self.by_player else color.enemy_atk
+
+    def format(self) -> str:
+        result = "hits!" if self.hits else "misses."
+        return (
+            f"{self.attacker.capitalize()} attempts to attack {self.target} and "
+            f"{result} ({self.roll} vs. AC{self.ac})"
+        )
+
+
+class DamageDealt(GameEvent):
+    def __init__(self, attacker: Actor, target: Actor, damage: int, damage_type: str):
+        super().__init__(target.x, target.y)
+        self.attacker = attacker.name
+        self.damage = damage
+        self.damage_type = damage_type
+        self.by_player = attacker is attacker.gamemap.engine.player
+        self.fg = color.player_atk if self.by_player else color.enemy_atk
+
+    def format(self) -> str:
+        if self.damage == 0:
+            return "However, they deal no damage."
+        return (
+            f"{self.attacker.capitalize()} deals {self.damage} {self.damage_type} "
+            "damage."
+        )
+
+
+class Died(GameEvent):
+    def __init__(self, actor: Actor):
+        super().__init__(actor.x, actor.y)
+        self.name = actor.name  # Kept since the name changes to "remains of ...".
+        self.is_player = actor is actor.gamemap.engine.player
+        self.fg = color.player_die if self.is_player else color.enemy_die
+
+    def format(self) -> str:
+        if self.is_player:
+            return "You died!"
+        return f"{self.name} is dead!"
+
+
+class ActionsRemaining(GameEvent):
+    def __init__(self, actor: Actor):
+        super().__init__(actor.x, actor.y)
+        self.name = actor.name
+        self.actions_remaining = actor.fighter.actions_remaining
+        self.is_player = actor is actor.gamemap.engine.player
+
+    def format(self) -> str:
+        return f"{self.name} has {self.actions_remaining} actions remaining."
+
+    def is_seen(self, engine: Engine) -> bool:
+        return self.is_player  # Only the player's own actions are worth a message.
+
+
+class Confused(GameEvent):
+    fg = color.status_effect_applied
+
+    def __init__(self, actor: Actor):
+        super().__init__(actor.x, actor.y)
+        self.name = actor.name
+
+    def format(self) -> str:
+        return (
+            f"The eyes of the {self.name} look vacant, "
+            "as it starts to stumble around!"
+        )
+
+
+class ConfusionEnded(GameEvent):
+    def __init__(self, actor: Actor):
+        super().__init__(actor.x, actor.y)
+        self.name = actor.name
+
+    def format(self) -> str:
+        return f"The {self.name} is no longer confused."
+
+
+class Engulfed(GameEvent):
+    def __init__(self, actor: Actor, damage: int):
+        super().__init__(actor.x, actor.y)
+        self.name = actor.name
+        self.damage = damage
+
+    def format(self) -> str:
+        return (
+            f"The {self.name} is engulfed in a fiery explosion, "
+            f"taking {self.damage} damage!"
+        )
+
+
+class LightningStruck(GameEvent):
+    def __init__(self, actor: Actor, damage: int):
+        super().__init__(actor.x, actor.y)
+        self.name = actor.name
+        self.damage = damage
+
+    def format(self) -> str:
+        return (
+            f"A lighting bolt strikes the {self.name} with a loud thunder, "
+            f"for {self.damage} damage!"
+        )
+
+
+class Healed(GameEvent):
+    fg = color.health_recovered
+
+    def __init__(self, actor: Actor, item_name: str, amount: int):
+        super().__init__(actor.x, actor.y)
+        self.item_name = item_name
+        self.amount = amount
+
+    def format(self) -> str:
+        return f"You consume the {self.item_name}, and recover {self.amount} HP!"
@@ -1,17 +1,42 @@
 from __future__ import annotations
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
 
 import numpy as np  # type: ignore
 from tcod.console import Console
+from tcod.map import compute_fov
 
+from chunked_grid import BitGrid, ChunkedGrid
 from entity import Actor, Item
+from spatial_index import SpatialIndex
 import tile_types
 
 if TYPE_CHECKING:
+    from camera import Camera
     from engine import Engine
     from entity import Entity
 
+# Corpses and other marks on the floor, drawn beneath every entity.
+decal_dt = np.dtype(
+    [
+        ("x", np.int32),
+        ("y", np.int32),
+        ("ch", np.int32),
+        ("fg", "3B"),
+        ("name", np.int32),  # Index into GameMap.decal_names.
+    ]
+)
+
 
 class GameMap:
     def __init__(
@@ -20,14 +45,29 @@ class GameMap:
         self.engine = engine
         self.width, self.height = width, height
         self.entities = set(entities)
-        self.tiles = np.full((width, height), fill_value=tile_types.wall, order="F")
+        # Finds the entities near a position without checking every entity.
+        self.entity_index = SpatialIndex()
+        for entity in self.entities:
+            self.entity_index.add(entity)
+        # Chunks of these are only allocated once they're used, so that a map
+        # needs memory for the area around the player and not the whole map.
+        self.tiles = ChunkedGrid(width, height, tile_types.tile_id_dt, tile_types.wall)
+
+        self.visible = BitGrid(width, height)  # Tiles the player can currently see
+        self.visible_view = (slice(0, 0), slice(0, 0))  # Where FOV was last computed.
+        self.explored = BitGrid(width, height)  # Tiles the player has seen before
 
-        self.visible = np.full(
-            (width, height), fill_value=False, order="F"
-        )  # Tiles the player can currently see
-        self.explored = np.full(
-            (width, height), fill_value=False, order="F"
-        )  # Tiles the player has seen before
+        # Actors are parked in the dormant set until something wakes them, only
+        # awake actors are given a turn by the engine.
+        self.dormant_actors: Set[Actor] = set()
+        self.awake_actors: Set[Actor] = set()
+
+        # Dead actors are compacted into these instead of staying entities.  Only
+        # the first decal_count decals are in use, the rest is room to grow.
+        self.decals = np.zeros(0, dtype=decal_dt)
+        self.decal_count = 0
+        self.decal_names: List[str] = []
+        self.decal_name_ids: Dict[str, int] = {}
 
         self.downstairs_location = (0, 0)
 
@@ -48,53 +88,251 @@ class GameMap:
     def items(self) -> Iterator[Item]:
         yield from (entity for entity in self.entities if isinstance(entity, Item))
 
+    def add_entity(self, entity: Entity) -> None:
+        self.entities.add(entity)
+        self.entity_index.add(entity)
+
+    def remove_entity(self, entity: Entity) -> None:
+        self.entities.remove(entity)
+        self.entity_index.remove(entity)
+
+    def get_entities_at_location(self, x: int, y: int) -> List[Entity]:
+        return list(self.entity_index.at(x, y))
+
+    def get_items_at_location(self, x: int, y: int) -> List[Item]:
+        return [
+            entity for entity in self.entity_index.at(x, y) if isinstance(entity, Item)
+        ]
+
+    def add_decal(
+        self, x: int, y: int, char: str, color: Tuple[int, int, int], name: str
+    ) -> None:
+        if self.decal_count == len(self.decals):
+            decals = np.zeros(max(16, len(self.decals) * 2), dtype=decal_dt)
+            decals[: self.decal_count] = self.decals
+            self.decals = decals
+        name_id = self.decal_name_ids.get(name)
+        if name_id is None:
+            name_id = self.decal_name_ids[name] = len(self.decal_names)
+            self.decal_names.append(name)
+        self.decals[self.decal_count] = x, y, ord(char), color, name_id
+        self.decal_count += 1
+
+    def add_corpse(self, actor: Actor) -> None:
+        """Replace the entity of a dead actor with a decal that looks the same."""
+        self.add_decal(actor.x, actor.y, actor.char, actor.color, actor.name)
+        self.remove_entity(actor)
+
+    def get_decal_names_at_location(self, x: int, y: int) -> List[str]:
+        decals = self.decals[: self.decal_count]
+        here = decals["name"][(decals["x"] == x) & (decals["y"] == y)]
+        return [self.decal_names[name_id] for name_id in here]
+
     def get_blocking_entity_at_location(
         self, location_x: int, location_y: int,
     ) -> Optional[Entity]:
-        for entity in self.entities:
-            if (
-                entity.blocks_movement
-                and entity.x == location_x
-                and entity.y == location_y
-            ):
+        for entity in self.entity_index.at(location_x, location_y):
+            if entity.blocks_movement:
                 return entity
 
         return None
 
     def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y:
-                return actor
+        for entity in self.entity_index.at(x, y):
+            if isinstance(entity, Actor) and entity.is_alive:
+                return entity
 
         return None
 
+    def get_actors_in_rect(self, x0: int, y0: int, x1: int, y1: int) -> List[Actor]:
+        """Return the living actors with x0 <= x < x1 and y0 <= y < y1."""
+        return [
+            entity
+            for entity in self.entity_index.in_rect(x0, y0, x1, y1)
+            if isinstance(entity, Actor) and entity.is_alive
+        ]
+
+    def get_nearest_actors(
+        self,
+        x: int,
+        y: int,
+        k: Optional[int] = None,
+        max_distance: Optional[float] = None,
+        condition: Optional[Callable[[Actor], bool]] = None,
+        inclusive: bool = True,
+    ) -> List[Actor]:
+        """Return living actors sorted by their distance from `x`, `y`, nearest first.
+
+        At most `k` actors are returned, and only those within `max_distance`.
+        If `inclusive` is False then actors exactly `max_distance` away are left
+        out too.  Actors are skipped if `condition` returns False for them.  The
+        search starts around `x`, `y` and only widens until it has found `k` actors.
+        """
+        radius = self.entity_index.bucket_size if max_distance is None else max_distance
+        while True:
+            r = int(np.ceil(radius))
+            actors = [
+                actor
+                for actor in self.get_actors_in_rect(x - r, y - r, x + r + 1, y + r + 1)
+                if condition is None or condition(actor)
+            ]
+            xs = np.array([actor.x for actor in actors], dtype=int)
+            ys = np.array([actor.y for actor in actors], dtype=int)
+            # Squared distances sort the same way and need no square roots.
+            distances = (xs - x) ** 2 + (ys - y) ** 2
+            if inclusive:
+                in_range = np.flatnonzero(distances <= radius ** 2)
+            else:
+                in_range = np.flatnonzero(distances < radius ** 2)
+            if (
+                max_distance is not None
+                or (k is not None and len(in_range) >= k)
+                or radius >= self.width + self.height  # Searched the whole map.
+            ):
+                break
+            radius *= 2
+
+        nearest = in_range[np.argsort(distances[in_range], kind="stable")][:k]
+        return [actors[i] for i in nearest]
+
+    def get_area_mask(
+        self, x: int, y: int, radius: int, require_los: bool = False
+    ) -> Tuple[Tuple[slice, slice], np.ndarray]:
+        """Return an area of the map around `x`, `y` and a mask of that area.
+
+        The mask is True for the tiles within `radius` of `x`, `y`.  If
+        `require_los` is True then tiles which can't be seen from `x`, `y` are
+        excluded too.
+        """
+        view = (
+            slice(max(0, x - radius), min(self.width, x + radius + 1)),
+            slice(max(0, y - radius), min(self.height, y + radius + 1)),
+        )
+        xs = np.arange(view[0].start, view[0].stop)[:, np.newaxis]
+        ys = np.arange(view[1].start, view[1].stop)[np.newaxis, :]
+        mask = (xs - x) ** 2 + (ys - y) ** 2 <= radius ** 2
+        if require_los:
+            mask &= compute_fov(
+                tile_types.palette["transparent"][self.tiles[view]],
+                (x - view[0].start, y - view[1].start),
+                radius=radius,
+            )
+        return view, mask
+
+    def get_actors_in_area(
+        self, view: Tuple[slice, slice], mask: np.ndarray
+    ) -> List[Actor]:
+        """Return the living actors standing on the True tiles of `mask`.
+
+        `mask` covers the area of the map given by `view`, any shape can be used.
+        """
+        actors = self.get_actors_in_rect(
+            view[0].start, view[1].start, view[0].stop, view[1].stop
+        )
+        xs = np.array([actor.x for actor in actors], dtype=int) - view[0].start
+        ys = np.array([actor.y for actor in actors], dtype=int) - view[1].start
+        inside = (0 <= xs) & (xs < mask.shape[0]) & (0 <= ys) & (ys < mask.shape[1])
+        hit = np.zeros(len(actors), dtype=bool)
+        hit[inside] = mask[xs[inside], ys[inside]]
+        return [actor for actor, is_hit in zip(actors, hit) if is_hit]
+
+    def get_actors_in_radius(
+        self, x: int, y: int, radius: int, require_los: bool = False
+    ) -> List[Actor]:
+        """Return the living actors within `radius` of `x`, `y`."""
+        return self.get_actors_in_area(
+            *self.get_area_mask(x, y, radius, require_los)
+        )
+
+    def wake(self, actor: Actor) -> None:
+        """Move a dormant actor into the set of actors that take turns."""
+        if actor in self.dormant_actors:
+            self.dormant_actors.remove(actor)
+            self.awake_actors.add(actor)
+            # Timed modifiers kept running out while it was dormant.
+            actor.fighter.end_turn()
+
+    def sleep(self, actor: Actor) -> None:
+        """Park an awake actor so the turn loop skips it until it is woken again."""
+        if actor in self.awake_actors:
+            self.awake_actors.remove(actor)
+            self.dormant_actors.add(actor)
+
+    def unschedule(self, actor: Actor) -> None:
+        """Remove an actor from the turn schedule entirely, such as when it dies."""
+        self.awake_actors.discard(actor)
+        self.dormant_actors.discard(actor)
+
+    def wake_visible(self) -> None:
+        """Wake every dormant actor standing inside of the players field of view."""
+        # Nothing outside of the area the FOV was computed for is visible.
+        view_x, view_y = self.visible_view
+        for actor in [
+            actor
+            for actor in self.get_actors_in_rect(
+                view_x.start, view_y.start, view_x.stop, view_y.stop
+            )
+            if actor in self.dormant_actors and self.visible[actor.x, actor.y]
+        ]:
+            self.wake(actor)
+
+    def make_noise(self, x: int, y: int, radius: int) -> None:
+        """Wake every dormant actor within `radius` tiles of a noise at `x`, `y`.
+
+        Woken actors are told where the noise came from so they can investigate it.
+        """
+        for actor in self.get_nearest_actors(
+            x, y, max_distance=radius, condition=self.dormant_actors.__contains__
+        ):
+            self.wake(actor)
+            if actor.ai:
+                actor.ai.hear_noise(x, y)
+
     def in_bounds(self, x: int, y: int) -> bool:
         """Return True if x and y are inside of the bounds of this map."""
         return 0 <= x < self.width and 0 <= y < self.height
 
-    def render(self, console: Console) -> None:
+    def is_walkable(self, x: int, y: int) -> bool:
+        return bool(tile_types.palette["walkable"][self.tiles[x, y]])
+
+    def render(self, console: Console, camera: Camera) -> None:
         """
-        Renders the map.
+        Renders the part of the map which is in view of the camera.
 
         If a tile is in the "visible" array, then draw it with the "light" colors.
         If it isn't, but it's in the "explored" array, then draw it with the "dark" colors.
         Otherwise, the default is "SHROUD".
         """
-        console.tiles_rgb[0 : self.width, 0 : self.height] = np.select(
-            condlist=[self.visible, self.explored],
-            choicelist=[self.tiles["light"], self.tiles["dark"]],
+        screen_view, map_view = camera.get_views(self.width, self.height)
+        tiles = self.tiles[map_view]
+        visible = self.visible[map_view]
+        console.tiles_rgb[screen_view] = np.select(
+            condlist=[visible, self.explored[map_view]],
+            choicelist=[
+                tile_types.palette["light"][tiles],
+                tile_types.palette["dark"][tiles],
+            ],
             default=tile_types.SHROUD,
         )
 
+        decals = self.decals[: self.decal_count]
+        xs = decals["x"] - camera.x
+        ys = decals["y"] - camera.y
+        width, height = visible.shape
+        shown = (0 <= xs) & (xs < width) & (0 <= ys) & (ys < height)
+        shown[shown] = visible[xs[shown], ys[shown]]
+        console.ch[xs[shown], ys[shown]] = decals["ch"][shown]
+        console.fg[xs[shown], ys[shown]] = decals["fg"][shown]
+
         entities_sorted_for_rendering = sorted(
-            self.entities, key=lambda x: x.render_order.value
+            (entity for entity in self.entities if camera.in_view(entity.x, entity.y)),
+            key=lambda x: x.render_order.value,
         )
 
         for entity in entities_sorted_for_rendering:
-            if self.visible[entity.x, entity.y]:
-                console.print(
-                    x=entity.x, y=entity.y, string=entity.char, fg=entity.color
-                )
+            x, y = camera.map_to_screen(entity.x, entity.y)
+            if visible[x, y]:
+                console.print(x=x, y=y, string=entity.char, fg=entity.color)
 
 
 class GameWorld:
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import os
 
-from typing import Callable, Optional, Tuple, TYPE_CHECKING, Union
+from typing import Any, Callable, Iterable, List, Optional, Tuple, TYPE_CHECKING, Union
 
+import numpy as np  # type: ignore
 import tcod
 
 import actions
@@ -14,11 +15,14 @@ from actions import (
     WaitAction,
 )
 import color
+from console_pool import pool
 import exceptions
+from profiler import profiler
 
 if TYPE_CHECKING:
     from engine import Engine
     from entity import Item
+    from message_log import Message
 
 
 MOVE_KEYS = {
@@ -64,6 +68,21 @@ MainGameEventHandler will become the active handler.
 
 
 class BaseEventHandler(tcod.event.EventDispatch[ActionOrHandler]):
+    dirty = True  # True if this handler needs to be rendered again.
+
+    def dispatch(self, event: Any) -> Optional[ActionOrHandler]:
+        if not isinstance(event, tcod.event.MouseMotion):
+            self.dirty = True  # Anything other than mouse motion may change the view.
+        return super().dispatch(event)
+
+    def is_dirty(self) -> bool:
+        """Return True if something visible has changed since the last frame."""
+        return self.dirty
+
+    def mark_clean(self) -> None:
+        """Called after this handler has been rendered and presented."""
+        self.dirty = False
+
     def handle_events(self, event: tcod.event.Event) -> BaseEventHandler:
         """Handle an event and return the next active event handler."""
         state = self.dispatch(event)
@@ -85,12 +104,18 @@ class PopupMessage(BaseEventHandler):
     def __init__(self, parent_handler: BaseEventHandler, text: str):
         self.parent = parent_handler
         self.text = text
+        pool.invalidate("popup")  # The parent may look different from the last popup.
 
     def on_render(self, console: tcod.Console) -> None:
-        """Render the parent and dim the result, then print the message on top."""
-        self.parent.on_render(console)
-        console.tiles_rgb["fg"] //= 8
-        console.tiles_rgb["bg"] //= 8
+        """Render the parent and dim the result, then print the message on top.
+
+        The parent can't change while this popup is open, so the dimmed parent is
+        only rendered once.
+        """
+        background = pool.get_cached(
+            "popup", console.width, console.height, None, self.render_background
+        )
+        background.blit(console)
 
         console.print(
             console.width // 2,
@@ -101,6 +126,11 @@ class PopupMessage(BaseEventHandler):
             alignment=tcod.CENTER,
         )
 
+    def render_background(self, console: tcod.Console) -> None:
+        self.parent.on_render(console)
+        console.tiles_rgb["fg"] //= 8
+        console.tiles_rgb["bg"] //= 8
+
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[BaseEventHandler]:
         """Any key returns to the parent handler."""
         return self.parent
@@ -153,8 +183,17 @@ class EventHandler(BaseEventHandler):
         self.engine.update_fov()
 
     def ev_mousemotion(self, event: tcod.event.MouseMotion) -> None:
-        if self.engine.game_map.in_bounds(event.tile.x, event.tile.y):
-            self.engine.mouse_location = event.tile.x, event.tile.y
+        camera = self.engine.camera
+        x, y = camera.screen_to_map(event.tile.x, event.tile.y)
+        if camera.in_view(x, y) and self.engine.game_map.in_bounds(x, y):
+            self.engine.mouse_location = x, y
+
+    def is_dirty(self) -> bool:
+        return self.dirty or self.engine.dirty
+
+    def mark_clean(self) -> None:
+        self.dirty = False
+        self.engine.dirty = False
 
     def on_render(self, console: tcod.Console) -> None:
         self.engine.render(console)
@@ -182,6 +221,17 @@ class AskUserEventHandler(EventHandler):
         """By default any mouse click exits this input handler."""
         return self.on_exit()
 
+    def menu_x(self) -> int:
+        """Return the x position which keeps a menu on the opposite side of the
+        screen from the player.
+        """
+        player_x, _ = self.engine.camera.map_to_screen(
+            self.engine.player.x, self.engine.player.y
+        )
+        if player_x <= 30:
+            return 40
+        return 0
+
     def on_exit(self) -> Optional[ActionOrHandler]:
         """Called when the user is trying to exit or cancel an action.
 
@@ -198,61 +248,54 @@ class CharacterScreenEventHandler(AskUserEventHandler):
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console)
 
-        if self.engine.player.x <= 30:
-            x = 40
-        else:
-            x = 0
+        x = self.menu_x()
 
         y = 0
 
         #width = len(self.TITLE) + 4
         width = 30
 
+        player = self.engine.player
+        fighter = player.fighter
+        lines = (
+            (1, f"Level: {player.level.current_level}"),
+            (2, f"XP: {player.level.current_xp}"),
+            (3, f"XP for next Level: {player.level.experience_to_next_level}"),
+            #Adding Pathfinder 2e stats to character screen
+            (6, f"Strength: {fighter.strength}, Mod: {fighter.strength_mod}"),
+            (7, f"Dexterity: {fighter.dexterity}, Mod: {fighter.dexterity_mod}"),
+            (8, f"Constitution: {fighter.constitution}, Mod: {fighter.constitution_mod}"),
+            (9, f"Intelligence: {fighter.intelligence}, Mod: {fighter.intelligence_mod}"),
+            (10, f"Wisdom: {fighter.wisdom}, Mod: {fighter.wisdom_mod}"),
+            (11, f"Charisma: {fighter.charisma}, Mod: {fighter.charisma_mod}"),
+        )
+
+        # The sheet is only redrawn when one of its lines has changed.
+        sheet = pool.get_cached(
+            self.TITLE,
+            width,
+            self.HEIGHT,
+            lines,
+            lambda sheet_console: self.render_sheet(sheet_console, lines),
+        )
+        sheet.blit(console, x, y)
+
+    def render_sheet(
+        self, console: tcod.Console, lines: Iterable[Tuple[int, str]]
+    ) -> None:
         console.draw_frame(
-            x=x,
-            y=y,
-            width=width,
-            height=self.HEIGHT,
+            x=0,
+            y=0,
+            width=console.width,
+            height=console.height,
             title=self.TITLE,
             clear=True,
             fg=(255, 255, 255),
             bg=(0, 0, 0),
         )
 
-
-        console.print(
-            x=x + 1, y=y + 1, string=f"Level: {self.engine.player.level.current_level}"
-
-        )
-        console.print(
-            x=x + 1, y=y + 2, string=f"XP: {self.engine.player.level.current_xp}"
-        )
-        console.print(
-            x=x + 1,
-            y=y + 3,
-            string=f"XP for next Level: {self.engine.player.level.experience_to_next_level}",
-        )
-
-        #Adding Pathfinder 2e stats to character screen
-
-        console.print(
-            x=x + 1, y=y + 6, string=f"Strength: {self.engine.player.fighter.strength}, Mod: {self.engine.player.fighter.strength_mod}"
-        )
-        console.print(
-            x=x + 1, y=y + 7, string=f"Dexterity: {self.engine.player.fighter.dexterity}, Mod: {self.engine.player.fighter.dexterity_mod}"
-        )
-        console.print(
-            x=x + 1, y=y + 8, string=f"Constitution: {self.engine.player.fighter.constitution}, Mod: {self.engine.player.fighter.constitution_mod}"
-        )
-        console.print(
-            x=x + 1, y=y + 9, string=f"Intelligence: {self.engine.player.fighter.intelligence}, Mod: {self.engine.player.fighter.intelligence_mod}"
-        )
-        console.print(
-            x=x + 1, y=y + 10, string=f"Wisdom: {self.engine.player.fighter.wisdom}, Mod: {self.engine.player.fighter.wisdom_mod}"
-        )
-        console.print(
-            x=x + 1, y=y + 11, string=f"Charisma: {self.engine.player.fighter.charisma}, Mod: {self.engine.player.fighter.charisma_mod}"
-        )
+        for y, string in lines:
+            console.print(x=1, y=y, string=string)
 
 
 class LevelUpEventHandler(AskUserEventHandler):
@@ -261,10 +304,7 @@ class LevelUpEventHandler(AskUserEventHandler):
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console)
 
-        if self.engine.player.x <= 30:
-            x = 40
-        else:
-            x = 0
+        x = self.menu_x()
 
         console.draw_frame(
             x=x,
@@ -288,12 +328,15 @@ class LevelUpEventHandler(AskUserEventHandler):
         console.print(
             x=x + 1,
             y=5,
-            string=f"b) Strength (+1 attack, from {self.engine.player.fighter.power})",
+            string=(
+                "b) Strength (+1 attack, from "
+                f"{self.engine.player.fighter.attack_bonus})"
+            ),
         )
         console.print(
             x=x + 1,
             y=6,
-            string=f"c) Agility (+1 defense, from {self.engine.player.fighter.defense})",
+            string=f"c) Agility (+1 AC, from {self.engine.player.fighter.ac})",
         )
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[ActionOrHandler]:
@@ -345,40 +388,55 @@ class InventoryEventHandler(AskUserEventHandler):
         if height <= 3:
             height = 3
 
-        if self.engine.player.x <= 30:
-            x = 40
-        else:
-            x = 0
+        x = self.menu_x()
 
         y = 0
 
         width = len(self.TITLE) + 4
 
+        item_strings = []
+        for i, item in enumerate(self.engine.player.inventory.items):
+            item_key = chr(ord("a") + i)
+
+            is_equipped = self.engine.player.equipment.item_is_equipped(item)
+
+            item_string = f"({item_key}) {item.name} {item.item_level}"
+
+            if item.quantity > 1:
+                item_string = f"{item_string} (x{item.quantity})"
+
+            if is_equipped:
+                item_string = f"{item_string} (E)"
+
+            item_strings.append(item_string)
+
+        # The menu is only redrawn when the listed items have changed.
+        menu = pool.get_cached(
+            self.TITLE,
+            width,
+            height,
+            tuple(item_strings),
+            lambda menu_console: self.render_menu(menu_console, item_strings),
+        )
+        menu.blit(console, x, y)
+
+    def render_menu(self, console: tcod.Console, item_strings: List[str]) -> None:
         console.draw_frame(
-            x=x,
-            y=y,
-            width=width,
-            height=height,
+            x=0,
+            y=0,
+            width=console.width,
+            height=console.height,
             title=self.TITLE,
             clear=True,
             fg=(255, 255, 255),
             bg=(0, 0, 0),
         )
 
-        if number_of_items_in_inventory > 0:
-            for i, item in enumerate(self.engine.player.inventory.items):
-                item_key = chr(ord("a") + i)
-
-                is_equipped = self.engine.player.equipment.item_is_equipped(item)
-
-                item_string = f"({item_key}) {item.name} {item.item_level}"
-
-                if is_equipped:
-                    item_string = f"{item_string} (E)"
-
-                console.print(x + 1, y + i + 1, item_string)
+        if item_strings:
+            for i, item_string in enumerate(item_strings):
+                console.print(1, i + 1, item_string)
         else:
-            console.print(x + 1, y + 1, "(Empty)")
+            console.print(1, 1, "(Empty)")
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[ActionOrHandler]:
         player = self.engine.player
@@ -436,7 +494,7 @@ class SelectIndexHandler(AskUserEventHandler):
     def on_render(self, console: tcod.Console) -> None:
         """Highlight the tile under the cursor."""
         super().on_render(console)
-        x, y = self.engine.mouse_location
+        x, y = self.engine.camera.map_to_screen(*self.engine.mouse_location)
         console.tiles_rgb["bg"][x, y] = color.white
         console.tiles_rgb["fg"][x, y] = color.black
 
@@ -456,9 +514,11 @@ class SelectIndexHandler(AskUserEventHandler):
             dx, dy = MOVE_KEYS[key]
             x += dx * modifier
             y += dy * modifier
-            # Clamp the cursor index to the map size.
-            x = max(0, min(x, self.engine.game_map.width - 1))
-            y = max(0, min(y, self.engine.game_map.height - 1))
+            # Clamp the cursor index to the part of the map on the screen.
+            camera = self.engine.camera
+            game_map = self.engine.game_map
+            x = max(camera.x, min(x, camera.x + camera.width - 1, game_map.width - 1))
+            y = max(camera.y, min(y, camera.y + camera.height - 1, game_map.height - 1))
             self.engine.mouse_location = x, y
             return None
         elif key in CONFIRM_KEYS:
@@ -469,9 +529,11 @@ class SelectIndexHandler(AskUserEventHandler):
         self, event: tcod.event.MouseButtonDown
     ) -> Optional[ActionOrHandler]:
         """Left click confirms a selection."""
-        if self.engine.game_map.in_bounds(*event.tile):
+        camera = self.engine.camera
+        x, y = camera.screen_to_map(*event.tile)
+        if camera.in_view(x, y) and self.engine.game_map.in_bounds(x, y):
             if event.button == 1:
-                return self.on_index_selected(*event.tile)
+                return self.on_index_selected(x, y)
         return super().ev_mousebuttondown(event)
 
     def on_index_selected(self, x: int, y: int) -> Optional[ActionOrHandler]:
@@ -516,20 +578,20 @@ class AreaRangedAttackHandler(SelectIndexHandler):
         self.callback = callback
 
     def on_render(self, console: tcod.Console) -> None:
-        """Highlight the tile under the cursor."""
+        """Highlight the tile under the cursor and the tiles in the targeted area."""
         super().on_render(console)
 
-        x, y = self.engine.mouse_location
-
-        # Draw a rectangle around the targeted area, so the player can see the affected tiles.
-        console.draw_frame(
-            x=x - self.radius - 1,
-            y=y - self.radius - 1,
-            width=self.radius ** 2,
-            height=self.radius ** 2,
-            fg=color.red,
-            clear=False,
+        # Tint the tiles which would be affected, using the same area as the effect.
+        camera = self.engine.camera
+        view, mask = self.engine.game_map.get_area_mask(
+            *self.engine.mouse_location, self.radius
         )
+        xs, ys = np.nonzero(mask)
+        xs, ys = camera.map_to_screen(xs + view[0].start, ys + view[1].start)
+        on_screen = (0 <= xs) & (xs < camera.width) & (0 <= ys) & (ys < camera.height)
+        xs, ys = xs[on_screen], ys[on_screen]
+        bg = console.tiles_rgb["bg"]
+        bg[xs, ys] = bg[xs, ys] // 2 + np.array(color.red, dtype=np.uint8) // 2
 
     def on_index_selected(self, x: int, y: int) -> Optional[Action]:
         return self.callback((x, y))
@@ -573,6 +635,8 @@ class MainGameEventHandler(EventHandler):
             return LookHandler(self.engine)
         elif key == tcod.event.K_z:
             return PopupMessage(self, "This is a test")
+        elif key == tcod.event.K_F3:
+            profiler.toggle_overlay()
 
         # No valid key was pressed
         return action
@@ -583,6 +647,7 @@ class GameOverEventHandler(EventHandler):
         """Handle exiting out of a finished game."""
         if os.path.exists("savegame.sav"):
             os.remove("savegame.sav")  # Deletes the active save file.
+        self.engine.message_log.delete_spill_file()
         raise exceptions.QuitWithoutSaving()  # Avoid saving a finished game.
 
     def ev_quit(self, event: tcod.event.Quit) -> None:
@@ -606,14 +671,35 @@ class HistoryViewer(EventHandler):
 
     def __init__(self, engine: Engine):
         super().__init__(engine)
-        self.log_length = len(engine.message_log.messages)
+        self.log_length = len(engine.message_log)
         self.cursor = self.log_length - 1
+        # The last page read from the log, reused until the cursor moves.
+        self.page_range = (0, 0)
+        self.page: List[Message] = []
+        pool.invalidate("history")  # The log has changed since it was last viewed.
+
+    def get_page(self, height: int) -> List[Message]:
+        """Return the messages which can fit in `height` lines above the cursor."""
+        page_range = max(0, self.cursor + 1 - height), self.cursor + 1
+        if page_range != self.page_range:
+            self.page_range = page_range
+            self.page = self.engine.message_log.get_messages(*page_range)
+        return self.page
 
     def on_render(self, console: tcod.Console) -> None:
         super().on_render(console)  # Draw the main state as the background.
 
-        log_console = tcod.Console(console.width - 6, console.height - 6)
+        # The log window is reused between frames and only redrawn when scrolled.
+        log_console = pool.get_cached(
+            "history",
+            console.width - 6,
+            console.height - 6,
+            self.cursor,
+            self.render_history,
+        )
+        log_console.blit(console, 3, 3)
 
+    def render_history(self, log_console: tcod.Console) -> None:
         # Draw a frame with a custom banner title.
         log_console.draw_frame(0, 0, log_console.width, log_console.height)
         log_console.print_box(
@@ -627,9 +713,8 @@ class HistoryViewer(EventHandler):
             1,
             log_console.width - 2,
             log_console.height - 2,
-            self.engine.message_log.messages[: self.cursor + 1],
+            self.get_page(log_console.height - 2),
         )
-        log_console.blit(console, 3, 3)
 
     def ev_keydown(self, event: tcod.event.KeyDown) -> Optional[MainGameEventHandler]:
         # Fancy conditional movement to make it feel right.
@@ -1,13 +1,21 @@
 #!/usr/bin/env python3
+import startup_timer  # Imported first so that it can time every other import.
+
+import threading
+import time
 import traceback
 
 import tcod
 
 import color
 import exceptions
+import profiler
+import replay
 import setup_game
 import input_handlers
 
+startup_timer.mark("import main menu modules")
+
 
 def save_game(handler: input_handlers.BaseEventHandler, filename: str) -> None:
     """If the current event handler has an active Engine then save it."""
@@ -16,15 +24,28 @@ def save_game(handler: input_handlers.BaseEventHandler, filename: str) -> None:
         print("Game saved.")
 
 
+def is_key_repeat(event: tcod.event.Event) -> bool:
+    """Return True if this event was generated by a key being held down."""
+    return isinstance(event, tcod.event.KeyDown) and bool(event.repeat)
+
+
 def main() -> None:
     screen_width = 80
     screen_height = 50
+    max_fps = 60  # Frames are only rendered when something changed, at most this often.
+
+    profiler.enable_from_environment()
 
     tileset = tcod.tileset.load_tilesheet(
         "dejavu10x10_gs_tc.png", 32, 8, tcod.tileset.CHARMAP_TCOD
     )
+    startup_timer.mark("load tileset")
+
+    recorder = replay.Recorder.from_environment(screen_width, screen_height)
 
-    handler: input_handlers.BaseEventHandler = setup_game.MainMenu()
+    handler: input_handlers.BaseEventHandler = setup_game.MainMenu(
+        screen_width, screen_height
+    )
 
     with tcod.context.new_terminal(
         screen_width,
@@ -34,15 +55,45 @@ def main() -> None:
         vsync=True,
     ) as context:
         root_console = tcod.Console(screen_width, screen_height, order="F")
+        startup_timer.mark("open window")
+        frame_time = 1 / max_fps
+        next_frame = 0.0
+        rendered_handler = None  # The handler shown in the last presented frame.
         try:
             while True:
-                root_console.clear()
-                handler.on_render(console=root_console)
-                context.present(root_console)
+                now = time.perf_counter()
+                dirty = handler is not rendered_handler or handler.is_dirty()
+                if dirty and now >= next_frame:
+                    root_console.clear()
+                    handler.on_render(console=root_console)
+                    context.present(root_console)
+                    handler.mark_clean()
+                    if rendered_handler is None:
+                        startup_timer.mark("render first frame")
+                        startup_timer.report()
+                        # The menu is up, import the rest of the game while it's shown.
+                        threading.Thread(
+                            target=setup_game.preload_game_modules, daemon=True
+                        ).start()
+                    rendered_handler = handler
+                    dirty = False
+                    next_frame = now + frame_time
 
                 try:
-                    for event in tcod.event.wait():
+                    # Block until there is input, unless a frame is waiting on the cap.
+                    timeout = max(0.0, next_frame - now) if dirty else None
+                    budget_end = None
+                    for event in tcod.event.wait(timeout):
+                        # A held key repeats faster than turns can be processed on
+                        # busy floors.  Repeats arriving after this frames budget is
+                        # spent are dropped rather than queued up as input lag.
+                        if budget_end is None:
+                            budget_end = time.perf_counter() + frame_time
+                        elif is_key_repeat(event) and time.perf_counter() > budget_end:
+                            continue
                         context.convert_event(event)
+                        if recorder:
+                            recorder.record(event)
                         handler = handler.handle_events(event)
                 except Exception:  # Handle exceptions in game.
                     traceback.print_exc()  # Print error to stderr.
@@ -51,6 +102,7 @@ def main() -> None:
                         handler.engine.message_log.add_message(
                             traceback.format_exc(), color.error
                         )
+                        handler.dirty = True
         except exceptions.QuitWithoutSaving:
             raise
         except SystemExit:  # Save and quit.
@@ -59,6 +111,9 @@ def main() -> None:
         except BaseException:  # Save on any other unexpected exception.
             save_game(handler, "savegame.sav")
             raise
+        finally:
+            if recorder:
+                recorder.close(handler)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,40 @@
-from typing import Iterable, List, Reversible, Tuple
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Reversible, Tuple
+import itertools
+import json
+import os
+import struct
 import textwrap
 
 import tcod
 
 import color
 
+# Each record in a spill index file is the byte offset of a message in the spill file.
+SPILL_OFFSET = struct.Struct("<Q")
+
 
 class Message:
     def __init__(self, text: str, fg: Tuple[int, int, int]):
         self.plain_text = text
         self.fg = fg
-        self.count = 1
+        self._count = 1
+        self._wrapped: Dict[int, List[str]] = {}  # Wrapped lines keyed by width.
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Leave the wrapped line cache out of save files."""
+        state = self.__dict__.copy()
+        state["_wrapped"] = {}
+        return state
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @count.setter
+    def count(self, value: int) -> None:
+        self._count = value
+        self._wrapped.clear()  # The full text has changed.
 
     @property
     def full_text(self) -> str:
@@ -19,10 +43,35 @@ class Message:
             return f"{self.plain_text} (x{self.count})"
         return self.plain_text
 
+    def wrapped(self, width: int) -> List[str]:
+        """Return the full text wrapped to `width`.
+
+        The lines are cached until the count of this message changes.
+        """
+        lines = self._wrapped.get(width)
+        if lines is None:
+            lines = self._wrapped[width] = list(MessageLog.wrap(self.full_text, width))
+        return lines
+
 
 class MessageLog:
-    def __init__(self) -> None:
-        self.messages: List[Message] = []
+    def __init__(self, capacity: int = 200, spill_filename: Optional[str] = None) -> None:
+        """Keep the last `capacity` messages in memory.
+
+        Older messages are appended to `spill_filename` if it is set, otherwise
+        they are discarded.
+        """
+        self.messages: Deque[Message] = deque(maxlen=capacity)
+        self.spill_filename = spill_filename
+        self.spilled_count = 0  # The number of messages written to the spill file.
+
+    def __len__(self) -> int:
+        """Return the number of messages which can be read back from this log."""
+        return self.spilled_count + len(self.messages)
+
+    @property
+    def spill_index_filename(self) -> str:
+        return f"{self.spill_filename}.idx"
 
     def add_message(
         self, text: str, fg: Tuple[int, int, int] = color.white, *, stack: bool = True,
@@ -37,8 +86,85 @@ class MessageLog:
         if stack and self.messages and text == self.messages[-1].plain_text:
             self.messages[-1].count += 1
         else:
+            if len(self.messages) == self.messages.maxlen:
+                self.spill(self.messages[0])  # About to fall out of the ring buffer.
             self.messages.append(Message(text, fg))
 
+    def spill(self, message: Message) -> None:
+        """Append `message` to the end of the spill file."""
+        if self.spill_filename is None:
+            return
+
+        position = self.spilled_count
+        with open(self.spill_filename, "a+b") as log, open(
+            self.spill_index_filename, "a+b"
+        ) as index:
+            index.seek(0, os.SEEK_END)
+            records = index.tell() // SPILL_OFFSET.size
+            if records > position:
+                # Drop records left behind by an older session or a newer save.
+                index.seek(position * SPILL_OFFSET.size)
+                (log_end,) = SPILL_OFFSET.unpack(index.read(SPILL_OFFSET.size))
+                index.truncate(position * SPILL_OFFSET.size)
+                log.truncate(log_end)
+            # Pad out any records which went missing so that the indexes line up.
+            missing = [Message("(Message lost.)", color.impossible)] * (
+                position - records
+            )
+            log.seek(0, os.SEEK_END)
+            for record in missing + [message]:
+                index.write(SPILL_OFFSET.pack(log.tell()))
+                log.write(
+                    json.dumps([record.plain_text, record.fg, record.count]).encode()
+                    + b"\n"
+                )
+        self.spilled_count += 1
+
+    def get_messages(self, start: int, stop: int) -> List[Message]:
+        """Return the messages from index `start` up to `stop`.
+
+        Messages which are no longer in memory are read back from the spill file.
+        """
+        start = max(0, start)
+        stop = min(stop, len(self))
+        messages: List[Message] = []
+        if start < self.spilled_count:
+            messages += self.read_spilled(start, min(stop, self.spilled_count))
+        messages += itertools.islice(
+            self.messages,
+            max(0, start - self.spilled_count),
+            max(0, stop - self.spilled_count),
+        )
+        return messages
+
+    def read_spilled(self, start: int, stop: int) -> List[Message]:
+        """Read the spilled messages from index `start` up to `stop`."""
+        if self.spill_filename is None or start >= stop:
+            return []
+        messages: List[Message] = []
+        try:
+            with open(self.spill_index_filename, "rb") as index:
+                index.seek(start * SPILL_OFFSET.size)
+                (offset,) = SPILL_OFFSET.unpack(index.read(SPILL_OFFSET.size))
+            with open(self.spill_filename, "rb") as log:
+                log.seek(offset)
+                for line in itertools.islice(log, stop - start):
+                    text, fg, count = json.loads(line)
+                    message = Message(text, tuple(fg))
+                    message.count = count
+                    messages.append(message)
+        except (FileNotFoundError, struct.error):
+            pass  # The spill file was removed, the old history is gone.
+        return messages
+
+    def delete_spill_file(self) -> None:
+        """Remove the spill file and its index from the disk."""
+        if self.spill_filename is None:
+            return
+        for filename in (self.spill_filename, self.spill_index_filename):
+            if os.path.exists(filename):
+                os.remove(filename)
+
     def render(
         self, console: tcod.Console, x: int, y: int, width: int, height: int,
     ) -> None:
@@ -75,7 +201,7 @@ class MessageLog:
         y_offset = height - 1
 
         for message in reversed(messages):
-            for line in reversed(list(cls.wrap(message.full_text, width))):
+            for line in reversed(message.wrapped(width)):
                 console.print(x=x, y=y + y_offset, string=line, fg=message.fg)
                 y_offset -= 1
                 if y_offset < 0:
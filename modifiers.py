@@ -0,0 +1,130 @@
+"""Typed bonuses and penalties, stacked the way Pathfinder 2e stacks them."""
+from __future__ import annotations
+
+from enum import auto, Enum
+from typing import Any, Dict, Iterable, List, Optional
+
+# The stats which modifiers can apply to.
+AC = "ac"
+ATTACK = "attack"
+DAMAGE = "damage"
+
+
+class BonusType(Enum):
+    CIRCUMSTANCE = auto()
+    STATUS = auto()
+    ITEM = auto()
+    UNTYPED = auto()
+
+
+class Modifier:
+    """A bonus to a stat, or a penalty if `value` is negative.
+
+    `source` is whatever applied the modifier, so that everything from one
+    source can be removed at once.  `duration` is the number of turns it lasts,
+    or None if the modifier lasts until it's removed.
+    """
+
+    def __init__(
+        self,
+        stat: str,
+        value: int,
+        bonus_type: BonusType = BonusType.UNTYPED,
+        source: Any = None,
+        duration: Optional[int] = None,
+    ):
+        self.stat = stat
+        self.value = value
+        self.bonus_type = bonus_type
+        self.source = source
+        self.duration = duration
+
+
+def stack(modifiers: Iterable[Modifier]) -> int:
+    """Return the total of `modifiers` after applying the stacking rules.
+
+    Only the highest bonus and the worst penalty of each type count, except for
+    untyped modifiers which all count.
+    """
+    bonuses: Dict[BonusType, int] = {}
+    penalties: Dict[BonusType, int] = {}
+    total = 0
+    for modifier in modifiers:
+        kind = modifier.bonus_type
+        if kind is BonusType.UNTYPED:
+            total += modifier.value
+        elif modifier.value > 0:
+            bonuses[kind] = max(bonuses.get(kind, 0), modifier.value)
+        else:
+            penalties[kind] = min(penalties.get(kind, 0), modifier.value)
+    return total + sum(bonuses.values()) + sum(penalties.values())
+
+
+class ModifierRegistry:
+    """The modifiers applied to one fighter, grouped by stat.
+
+    The total of each stat is remembered until a modifier to that stat is added
+    or removed, so reading a total doesn't depend on how many modifiers there are.
+    """
+
+    def __init__(self) -> None:
+        self.modifiers: Dict[str, List[Modifier]] = {}
+        self.totals: Dict[str, int] = {}  # Stacked totals, by stat.
+        # The modifiers which have a duration, and the game turn they expire on.
+        self.timed: Dict[Modifier, int] = {}
+
+    def __len__(self) -> int:
+        return sum(len(modifiers) for modifiers in self.modifiers.values())
+
+    def get(self, stat: str) -> List[Modifier]:
+        return self.modifiers.get(stat, [])
+
+    def total(self, stat: str) -> int:
+        total = self.totals.get(stat)
+        if total is None:
+            total = self.totals[stat] = stack(self.get(stat))
+        return total
+
+    def add(self, modifier: Modifier, turn: int = 0) -> None:
+        """Add `modifier` on game turn `turn`, which timed modifiers count from."""
+        self.modifiers.setdefault(modifier.stat, []).append(modifier)
+        self.totals.pop(modifier.stat, None)
+        if modifier.duration is not None:
+            self.timed[modifier] = turn + modifier.duration
+
+    def remove(self, modifier: Modifier) -> None:
+        modifiers = self.modifiers[modifier.stat]
+        modifiers.remove(modifier)
+        if not modifiers:
+            del self.modifiers[modifier.stat]
+        self.totals.pop(modifier.stat, None)
+        if modifier.duration is not None:
+            del self.timed[modifier]
+
+    def remove_source(self, source: Any) -> bool:
+        """Remove every modifier from `source`.  Returns True if any were removed."""
+        removed = [
+            modifier
+            for modifiers in self.modifiers.values()
+            for modifier in modifiers
+            if modifier.source is source
+        ]
+        for modifier in removed:
+            self.remove(modifier)
+        return bool(removed)
+
+    def expire(self, turn: int) -> bool:
+        """Remove the modifiers which have run out by game turn `turn`.  Returns
+        True if any were removed.
+
+        Expiry depends only on the turn, so a fighter which misses turns, such as
+        a dormant one, loses its modifiers on time once this is called again.
+        """
+        if not self.timed:
+            return False
+        expired = [
+            modifier for modifier, expires in self.timed.items() if expires <= turn
+        ]
+        for modifier in expired:
+            self.remove(modifier)
+        return bool(expired)
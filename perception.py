@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from typing import Iterable, Set, TYPE_CHECKING
+
+import numpy as np  # type: ignore
+from tcod.map import compute_fov
+
+import tile_types
+
+if TYPE_CHECKING:
+    from entity import Actor
+    from game_map import GameMap
+
+
+class Perception:
+    """Works out which actors can see a target, for all of the actors at once.
+
+    Instead of computing a field of view for every actor, one field of view is
+    computed from the target out to the longest vision radius.  Each actor can
+    see the target if it's inside of that field of view and its own radius.
+    """
+
+    def __init__(self) -> None:
+        self.seers: Set[Actor] = set()  # The actors which saw the target last update.
+
+    def update(self, game_map: GameMap, target: Actor, actors: Iterable[Actor]) -> None:
+        """Recompute which of `actors` can see `target`."""
+        actors = [actor for actor in actors if actor is not target]
+        self.seers = set()
+        if not actors:
+            return
+
+        xs = np.array([actor.x for actor in actors])
+        ys = np.array([actor.y for actor in actors])
+        radii = np.array([actor.fighter.vision_radius for actor in actors])
+
+        radius = int(radii.max())
+        x0 = max(0, target.x - radius)
+        y0 = max(0, target.y - radius)
+        x1 = min(game_map.width, target.x + radius + 1)
+        y1 = min(game_map.height, target.y + radius + 1)
+        fov = compute_fov(
+            tile_types.palette["transparent"][game_map.tiles[x0:x1, y0:y1]],
+            (target.x - x0, target.y - y0),
+            radius=radius,
+        )
+
+        # The default FOV algorithm's radius is a square, so is the vision radius.
+        in_range = np.maximum(abs(xs - target.x), abs(ys - target.y)) <= radii
+        sees = np.zeros_like(in_range)
+        sees[in_range] = fov[xs[in_range] - x0, ys[in_range] - y0]
+
+        self.seers = {actor for actor, seen in zip(actors, sees) if seen}
+
+    def can_see_target(self, actor: Actor) -> bool:
+        """Return True if `actor` could see the target at the last update."""
+        return actor in self.seers
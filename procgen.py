@@ -26,19 +26,9 @@ max_monsters_by_floor = [
     (6, 5),
 ]
 
-item_chances: Dict[int, List[Tuple[Entity, int]]] = {
-    0: [(entity_factories.health_potion, 35)],
-    2: [(entity_factories.confusion_scroll, 10)],
-    4: [(entity_factories.lightning_scroll, 25), (entity_factories.sword, 5)],
-    6: [(entity_factories.fireball_scroll, 25), (entity_factories.chain_mail, 15)],
-}
-
-enemy_chances: Dict[int, List[Tuple[Entity, int]]] = {
-    0: [(entity_factories.orc, 80)],
-    3: [(entity_factories.goblin_pyro, 15)],
-    5: [(entity_factories.goblin_pyro, 30)],
-    7: [(entity_factories.goblin_pyro, 60)],
-}
+# Generated from the spawn weights in the entity definitions.
+item_chances: Dict[int, List[Tuple[Entity, int]]] = entity_factories.item_chances
+enemy_chances: Dict[int, List[Tuple[Entity, int]]] = entity_factories.enemy_chances
 
 
 def get_max_value_for_floor(
@@ -130,7 +120,7 @@ def place_entities(room: RectangularRoom, dungeon: GameMap, floor_number: int,)
         x = random.randint(room.x1 + 1, room.x2 - 1)
         y = random.randint(room.y1 + 1, room.y2 - 1)
 
-        if not any(entity.x == x and entity.y == y for entity in dungeon.entities):
+        if not dungeon.get_entities_at_location(x, y):
             entity.spawn(dungeon, x, y)
 
 
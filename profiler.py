@@ -0,0 +1,208 @@
+"""Optional timers around the engine's hot paths.
+
+The timers are installed by wrapping the methods in `HOT_PATHS` when profiling
+is enabled, and the original methods are put back when it's disabled, so
+there's no overhead at all while profiling is off.
+
+Set the TRAILBLAZER_PROFILE environment variable to a .json or .csv filename to
+profile from startup and export the results to that file on exit.
+"""
+from __future__ import annotations
+
+import atexit
+from collections import deque
+import csv
+import functools
+import importlib
+import json
+import os
+import time
+from typing import Any, Callable, Deque, Dict, List, Tuple, TYPE_CHECKING
+
+import color
+
+if TYPE_CHECKING:
+    from tcod import Console
+
+ENVIRONMENT_VARIABLE = "TRAILBLAZER_PROFILE"
+
+# The module, class and method name of each timed hot path.
+HOT_PATHS = (
+    ("engine", "Engine", "handle_enemy_turns"),
+    ("engine", "Engine", "update_fov"),
+    ("perception", "Perception", "update"),
+    ("engine", "Engine", "save_as"),
+    ("components.ai", "BaseAI", "get_path_to"),
+    ("game_map", "GameMap", "render"),
+    ("message_log", "MessageLog", "render"),
+)
+
+# The upper edges of each histogram bucket, in milliseconds.
+HISTOGRAM_EDGES = (0.01, 0.1, 1.0, 10.0, 100.0, float("inf"))
+
+
+class Timer:
+    """Keeps a rolling window of the durations of one hot path."""
+
+    def __init__(self, name: str, window: int = 1000):
+        self.name = name
+        self.samples: Deque[float] = deque(maxlen=window)  # In seconds.
+        self.calls = 0
+        self.total = 0.0
+
+    def add(self, elapsed: float) -> None:
+        self.samples.append(elapsed)
+        self.calls += 1
+        self.total += elapsed
+
+    def percentile(self, fraction: float) -> float:
+        """Return a percentile of the rolling window in milliseconds."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    def histogram(self) -> List[int]:
+        """Return the number of samples in the window which fall in each bucket."""
+        counts = [0] * len(HISTOGRAM_EDGES)
+        for sample in self.samples:
+            milliseconds = sample * 1000
+            for i, edge in enumerate(HISTOGRAM_EDGES):
+                if milliseconds <= edge:
+                    counts[i] += 1
+                    break
+        return counts
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total * 1000 / self.calls if self.calls else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": max(self.samples, default=0.0) * 1000,
+            "histogram": self.histogram(),
+        }
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.timers: Dict[str, Timer] = {}
+        # The classes, method names, and original methods which were wrapped.
+        self.wrapped: List[Tuple[type, str, Callable[..., Any]]] = []
+        self.show_overlay = False
+        self.keep_enabled = False  # If True then hiding the overlay keeps profiling on.
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.wrapped)
+
+    def get_timer(self, name: str) -> Timer:
+        if name not in self.timers:
+            self.timers[name] = Timer(name)
+        return self.timers[name]
+
+    def wrap(self, cls: type, method_name: str) -> None:
+        """Replace a method of `cls` with one which records its duration."""
+        method = cls.__dict__[method_name]
+        timer = self.get_timer(f"{cls.__name__}.{method_name}")
+
+        @functools.wraps(method)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timer.add(time.perf_counter() - start)
+
+        setattr(cls, method_name, timed)
+        self.wrapped.append((cls, method_name, method))
+
+    def enable(self) -> None:
+        """Install the timers on every hot path."""
+        if self.enabled:
+            return
+        for module_name, class_name, method_name in HOT_PATHS:
+            module = importlib.import_module(module_name)
+            self.wrap(getattr(module, class_name), method_name)
+
+        # Time the perform method of every kind of AI.
+        ai_classes = [importlib.import_module("components.ai").BaseAI]
+        while ai_classes:
+            cls = ai_classes.pop()
+            ai_classes += cls.__subclasses__()
+            if "perform" in cls.__dict__:
+                self.wrap(cls, "perform")
+
+    def disable(self) -> None:
+        """Put back the original methods, the collected timings are kept."""
+        while self.wrapped:
+            cls, method_name, method = self.wrapped.pop()
+            setattr(cls, method_name, method)
+
+    def toggle_overlay(self) -> None:
+        """Show or hide the overlay, profiling is enabled while it's shown."""
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            self.enable()
+        elif not self.keep_enabled:
+            self.disable()
+
+    def export(self, filename: str) -> None:
+        """Write the summary of each timer to a .csv file, or a .json file otherwise."""
+        summaries = [timer.summary() for timer in self.timers.values()]
+        with open(filename, "w", newline="") as f:
+            if filename.endswith(".csv"):
+                writer = csv.writer(f)
+                columns = ["name", "calls", "total_ms", "mean_ms", "p50_ms", "p95_ms"]
+                writer.writerow(
+                    columns + ["max_ms"] + [f"<={edge}ms" for edge in HISTOGRAM_EDGES]
+                )
+                for summary in summaries:
+                    histogram = summary.pop("histogram")
+                    writer.writerow(list(summary.values()) + histogram)
+            else:
+                json.dump(
+                    {"histogram_edges_ms": HISTOGRAM_EDGES[:-1], "timers": summaries},
+                    f,
+                    indent=2,
+                )
+
+    def render(self, console: Console) -> None:
+        """Render the timings in the top right corner of the console."""
+        width = 50
+        height = len(self.timers) + 3
+        x = console.width - width
+
+        console.draw_frame(
+            x=x,
+            y=0,
+            width=width,
+            height=height,
+            title="Profiler",
+            clear=True,
+            fg=color.white,
+            bg=color.black,
+        )
+        console.print(x + 1, 1, f"{'':28}{'mean':>6}{'p95':>7}{'max':>7}")
+        for i, timer in enumerate(self.timers.values()):
+            summary = timer.summary()
+            console.print(
+                x + 1,
+                i + 2,
+                f"{timer.name[:27]:28}{summary['mean_ms']:6.2f}"
+                f"{summary['p95_ms']:7.2f}{summary['max_ms']:7.2f}",
+            )
+
+
+profiler = Profiler()
+
+
+def enable_from_environment() -> None:
+    """Start profiling if TRAILBLAZER_PROFILE is set and export the results at exit."""
+    filename = os.environ.get(ENVIRONMENT_VARIABLE)
+    if filename:
+        profiler.keep_enabled = True
+        profiler.enable()
+        atexit.register(profiler.export, filename)
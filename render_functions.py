@@ -15,7 +15,8 @@ def get_names_at_location(x: int, y: int, game_map: GameMap) -> str:
         return ""
 
     names = ", ".join(
-        entity.name for entity in game_map.entities if entity.x == x and entity.y == y
+        [entity.name for entity in game_map.get_entities_at_location(x, y)]
+        + game_map.get_decal_names_at_location(x, y)
     )
 
     return names.capitalize()
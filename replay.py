@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Record play sessions and replay them without a window.
+
+Set the TRAILBLAZER_RECORD environment variable to a filename to record the
+random seed and every event given to the event handlers.  The save which
+"Continue last game" would load is stored with it.  The final state of the game
+is hashed when the session ends, so that a replay can be checked against it:
+
+    python replay.py session.replay
+
+Replays run as fast as possible and exit with status 1 if the final state hash
+doesn't match the recorded one.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import lzma
+import os
+import random
+import sys
+import tempfile
+import time
+import traceback
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import tcod
+
+import color
+import exceptions
+import input_handlers
+
+ENVIRONMENT_VARIABLE = "TRAILBLAZER_RECORD"
+VERSION = 2
+
+SAVE_FILENAME = "savegame.sav"
+
+
+def encode_event(event: tcod.event.Event) -> Optional[List[Any]]:
+    """Return `event` as a compact list, or None if no handler uses this event."""
+    if isinstance(event, tcod.event.KeyDown):
+        return ["k", int(event.scancode), int(event.sym), int(event.mod), event.repeat]
+    if isinstance(event, tcod.event.MouseMotion):
+        return ["m", int(event.tile.x), int(event.tile.y)]
+    if isinstance(event, tcod.event.MouseButtonDown):
+        return ["b", int(event.tile.x), int(event.tile.y), int(event.button)]
+    if isinstance(event, tcod.event.Quit):
+        return ["q"]
+    return None
+
+
+def decode_event(record: List[Any]) -> tcod.event.Event:
+    """Return the event which was encoded by `encode_event`."""
+    kind = record[0]
+    if kind == "k":
+        scancode, sym, mod, repeat = record[1:]
+        return tcod.event.KeyDown(scancode=scancode, sym=sym, mod=mod, repeat=repeat)
+    if kind == "m":
+        return tcod.event.MouseMotion(tile=tcod.event.Point(*record[1:3]))
+    if kind == "b":
+        return tcod.event.MouseButtonDown(
+            tile=tcod.event.Point(*record[1:3]), button=record[3]
+        )
+    if kind == "q":
+        return tcod.event.Quit()
+    raise ValueError(f"Unknown event record: {record!r}")
+
+
+def state_hash(handler: input_handlers.BaseEventHandler) -> str:
+    """Return a hash of the game state behind `handler`.
+
+    Only the state which play depends on is hashed, things such as the mouse
+    position and the wording of messages are left out.
+    """
+    state: List[Any] = [type(handler).__name__]
+    if isinstance(handler, input_handlers.EventHandler):
+        engine = handler.engine
+        game_map = engine.game_map
+        state.append(engine.game_world.current_floor)
+        state.append(len(engine.message_log))
+        state.append(sorted(
+            (
+                entity.name,
+                entity.x,
+                entity.y,
+                getattr(getattr(entity, "fighter", None), "hp", None),
+            )
+            for entity in game_map.entities
+        ))
+        decals = game_map.decals[: game_map.decal_count]
+        state.append(hashlib.sha256(decals.tobytes()).hexdigest())
+        state.append(
+            [(item.name, item.quantity) for item in engine.player.inventory.items]
+        )
+        state.append(engine.player.level.current_xp)
+        state.append(hashlib.sha256(game_map.explored[:, :].tobytes()).hexdigest())
+    return hashlib.sha256(json.dumps(state).encode()).hexdigest()
+
+
+class Recorder:
+    """Writes the events given to the event handlers to an lzma compressed file.
+
+    The file is JSON lines, a header with the seed and the screen size, then one
+    line per event, then the final state hash.
+    """
+
+    def __init__(self, filename: str, seed: int, screen_width: int, screen_height: int):
+        save = None
+        if os.path.exists(SAVE_FILENAME):
+            with open(SAVE_FILENAME, "rb") as f:
+                save = base64.b64encode(f.read()).decode("ascii")
+        self.file = lzma.open(filename, "wt")
+        self.last_tile: Optional[Tuple[int, int]] = None
+        self.write(
+            {
+                "version": VERSION,
+                "seed": seed,
+                "screen": [screen_width, screen_height],
+                "save": save,
+            }
+        )
+
+    @classmethod
+    def from_environment(
+        cls, screen_width: int, screen_height: int
+    ) -> Optional[Recorder]:
+        """Start recording if TRAILBLAZER_RECORD is set, the game is seeded to match."""
+        filename = os.environ.get(ENVIRONMENT_VARIABLE)
+        if not filename:
+            return None
+        seed = random.randrange(2 ** 32)
+        random.seed(seed)
+        return cls(filename, seed, screen_width, screen_height)
+
+    def write(self, record: Any) -> None:
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def record(self, event: tcod.event.Event) -> None:
+        encoded = encode_event(event)
+        if encoded is None:
+            return
+        if encoded[0] == "m":
+            # Handlers only care about which tile the mouse is on.
+            if self.last_tile == (encoded[1], encoded[2]):
+                return
+            self.last_tile = encoded[1], encoded[2]
+        self.write(encoded)
+
+    def close(self, handler: input_handlers.BaseEventHandler) -> None:
+        """Finish the recording with the state hash of `handler`."""
+        self.write({"hash": state_hash(handler)})
+        self.file.close()
+
+
+def read_recording(filename: str) -> Tuple[Dict[str, Any], Iterator[List[Any]]]:
+    """Return the header of a recording and an iterator over its event records.
+
+    The final state hash is added to the header once the events are exhausted.
+    A recording which was cut short is replayed as far as it was written out.
+    """
+    f = lzma.open(filename, "rt")
+    header = json.loads(f.readline())
+    if header.get("version") != VERSION:
+        raise ValueError(f"Unsupported recording version: {header.get('version')}")
+
+    def events() -> Iterator[List[Any]]:
+        with f:
+            try:
+                for line in f:
+                    record = json.loads(line)
+                    if isinstance(record, dict):
+                        header.update(record)
+                        return
+                    yield record
+            except (EOFError, lzma.LZMAError, ValueError):
+                return  # Truncated.
+
+    return header, events()
+
+
+def replay(
+    filename: str, render: bool = False
+) -> Tuple[input_handlers.BaseEventHandler, Dict[str, Any], int]:
+    """Play back a recording in the current directory.
+
+    Returns the final handler, the recording header, and the number of events.
+    If `render` is True then every event is followed by a render to a console the
+    size of the recorded screen.
+    """
+    import setup_game
+
+    header, events = read_recording(filename)
+    if header["save"] is not None:
+        with open(SAVE_FILENAME, "wb") as f:
+            f.write(base64.b64decode(header["save"]))
+    random.seed(header["seed"])
+
+    screen_width, screen_height = header["screen"]
+    console = (
+        tcod.Console(screen_width, screen_height, order="F") if render else None
+    )
+    handler: input_handlers.BaseEventHandler = setup_game.MainMenu(
+        screen_width, screen_height
+    )
+    count = 0
+    for record in events:
+        count += 1
+        try:
+            handler = handler.handle_events(decode_event(record))
+        except (SystemExit, exceptions.QuitWithoutSaving):
+            break
+        except Exception:  # Reported the same way as main does.
+            traceback.print_exc()
+            if isinstance(handler, input_handlers.EventHandler):
+                handler.engine.message_log.add_message(
+                    traceback.format_exc(), color.error
+                )
+        if console is not None:
+            console.clear()
+            handler.on_render(console=console)
+    return handler, header, count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("filename", help="The recording to replay.")
+    parser.add_argument(
+        "--render", action="store_true", help="Render after every event."
+    )
+    args = parser.parse_args(argv)
+    filename = os.path.abspath(args.filename)
+
+    # Keep the replays save and message history away from the real ones.
+    os.chdir(tempfile.mkdtemp())
+
+    start = time.perf_counter()
+    handler, header, count = replay(filename, args.render)
+    elapsed = time.perf_counter() - start
+
+    result = state_hash(handler)
+    print(f"Replayed {count} events in {elapsed * 1000:.1f} ms.")
+    print(f"Final state hash: {result}")
+    if "hash" not in header:
+        print("The recording has no final state hash to check.", file=sys.stderr)
+    elif header["hash"] != result:
+        print(f"Expected state hash: {header['hash']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,36 +2,56 @@
 from __future__ import annotations
 
 import copy
+import importlib
 import lzma
 import pickle
 import traceback
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
 import tcod
 
 import color
-from engine import Engine
-import entity_factories
-from game_map import GameWorld
+from console_pool import pool
 import input_handlers
 
+if TYPE_CHECKING:
+    from engine import Engine
 
-# Load the background image and remove the alpha channel.
-background_image = tcod.image.load("menu_background.png")[:, :, :3]
+# Modules which are only needed once a game starts.  They are imported lazily so
+# that the main menu can be shown as soon as possible.
+GAME_MODULES = ("engine", "entity_factories", "game_map", "procgen")
 
+def preload_game_modules() -> None:
+    """Import the modules needed to start a game.
 
-def new_game() -> Engine:
+    This is meant to be run in a background thread while the main menu is open.
+    """
+    for name in GAME_MODULES:
+        importlib.import_module(name)
+
+
+def new_game(screen_width: int, screen_height: int) -> Engine:
     """Return a brand new game session as an Engine instance."""
+    from engine import Engine
+    import entity_factories
+    from game_map import GameWorld
+
     map_width = 80
     map_height = 43
 
+    ui_height = 7  # The rows under the map for the health bar and message log.
+
     room_max_size = 10
     room_min_size = 6
     max_rooms = 30
 
     player = copy.deepcopy(entity_factories.player)
 
-    engine = Engine(player=player)
+    engine = Engine(
+        player=player, view_width=screen_width, view_height=screen_height - ui_height
+    )
+    # Messages which no longer fit in memory are written out beside the save file.
+    engine.message_log.spill_filename = "savegame.log"
 
     engine.game_world = GameWorld(
         engine=engine,
@@ -59,13 +79,10 @@ def new_game() -> Engine:
     dagger = copy.deepcopy(entity_factories.dagger)
     leather_armor = copy.deepcopy(entity_factories.leather_armor)
 
-    dagger.parent = player.inventory
-    leather_armor.parent = player.inventory
-
-    player.inventory.items.append(dagger)
+    player.inventory.add(dagger)
     player.equipment.toggle_equip(dagger, add_message=False)
 
-    player.inventory.items.append(leather_armor)
+    player.inventory.add(leather_armor)
     player.equipment.toggle_equip(leather_armor, add_message=False)
 
     return engine
@@ -73,6 +90,8 @@ def new_game() -> Engine:
 
 def load_game(filename: str) -> Engine:
     """Load an Engine instance from a file."""
+    from engine import Engine
+
     with open(filename, "rb") as f:
         engine = pickle.loads(lzma.decompress(f.read()))
     assert isinstance(engine, Engine)
@@ -82,9 +101,15 @@ def load_game(filename: str) -> Engine:
 class MainMenu(input_handlers.BaseEventHandler):
     """Handle the main menu rendering and input."""
 
+    def __init__(self, screen_width: int, screen_height: int):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+
     def on_render(self, console: tcod.Console) -> None:
         """Render the main menu on a background image."""
-        console.draw_semigraphics(background_image, 0, 0)
+        pool.get_static_art("menu_background.png", console.width, console.height).blit(
+            console
+        )
 
         console.print(
             console.width // 2,
@@ -129,6 +154,8 @@ class MainMenu(input_handlers.BaseEventHandler):
                 traceback.print_exc()  # Print to stderr.
                 return input_handlers.PopupMessage(self, f"Failed to load save:\n{exc}")
         elif event.sym == tcod.event.K_n:
-            return input_handlers.MainGameEventHandler(new_game())
+            return input_handlers.MainGameEventHandler(
+                new_game(self.screen_width, self.screen_height)
+            )
 
         return None
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Dict, Iterator, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entity import Entity
+
+BucketKey = Tuple[int, int]
+
+
+class SpatialIndex:
+    """Buckets entities by position so that the entities near a point can be
+    found without looking at every entity on the map.
+
+    Entities have to be updated here whenever they move.
+    """
+
+    def __init__(self, bucket_size: int = 8):
+        self.bucket_size = bucket_size
+        self.buckets: Dict[BucketKey, Set[Entity]] = {}
+        self.keys: Dict[Entity, BucketKey] = {}  # The bucket each entity is in.
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, entity: Entity) -> None:
+        if entity in self.keys:
+            self.remove(entity)
+        key = entity.x // self.bucket_size, entity.y // self.bucket_size
+        self.buckets.setdefault(key, set()).add(entity)
+        self.keys[entity] = key
+
+    def remove(self, entity: Entity) -> None:
+        key = self.keys.pop(entity)
+        bucket = self.buckets[key]
+        bucket.remove(entity)
+        if not bucket:
+            del self.buckets[key]
+
+    def update(self, entity: Entity) -> None:
+        """Move `entity` to the bucket for its current position."""
+        key = entity.x // self.bucket_size, entity.y // self.bucket_size
+        if self.keys.get(entity) != key:
+            self.add(entity)
+
+    def in_rect(self, x0: int, y0: int, x1: int, y1: int) -> Iterator[Entity]:
+        """Iterate over the entities with x0 <= x < x1 and y0 <= y < y1."""
+        size = self.bucket_size
+        bx0, by0 = x0 // size, y0 // size
+        bx1, by1 = (x1 + size - 1) // size, (y1 + size - 1) // size
+        if (bx1 - bx0) * (by1 - by0) > len(self.buckets):
+            # Cheaper to check every bucket than every bucket key in the area.
+            buckets = [
+                bucket
+                for (bx, by), bucket in self.buckets.items()
+                if bx0 <= bx < bx1 and by0 <= by < by1
+            ]
+        else:
+            buckets = [
+                self.buckets[bx, by]
+                for bx in range(bx0, bx1)
+                for by in range(by0, by1)
+                if (bx, by) in self.buckets
+            ]
+        for bucket in buckets:
+            for entity in bucket:
+                if x0 <= entity.x < x1 and y0 <= entity.y < y1:
+                    yield entity
+
+    def at(self, x: int, y: int) -> Iterator[Entity]:
+        """Iterate over the entities at `x`, `y`."""
+        bucket = self.buckets.get((x // self.bucket_size, y // self.bucket_size), ())
+        for entity in bucket:
+            if entity.x == x and entity.y == y:
+                yield entity
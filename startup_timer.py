@@ -0,0 +1,114 @@
+"""An optional report of how long each step of starting the game takes.
+
+Set the TRAILBLAZER_STARTUP_REPORT environment variable to enable it.  This
+module should be the first one imported so that the import of every other
+module is timed.  When it's disabled every function here does nothing.
+"""
+from __future__ import annotations
+
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+ENVIRONMENT_VARIABLE = "TRAILBLAZER_STARTUP_REPORT"
+
+
+class TimedLoader(importlib.abc.Loader):
+    """Wraps another loader and records how long its modules take to execute."""
+
+    def __init__(self, timer: ImportTimer, loader: Any):
+        self.timer = timer
+        self.loader = loader
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.loader, name)
+
+    def create_module(self, spec: Any) -> Any:
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        stack = self.timer.get_stack()
+        stack.append(0.0)  # Time spent importing other modules from this one.
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.timer.self_times[module.__name__] = elapsed - nested
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """Finds modules with the other finders and times them with a TimedLoader."""
+
+    def __init__(self) -> None:
+        self.self_times: Dict[str, float] = {}
+        self.local = threading.local()
+
+    def get_stack(self) -> List[float]:
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def find_spec(
+        self, fullname: str, path: Optional[Sequence[str]], target: Any = None
+    ) -> Any:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if hasattr(spec.loader, "exec_module"):
+                    spec.loader = TimedLoader(self, spec.loader)
+                return spec
+        return None
+
+
+class StartupTimer:
+    def __init__(self) -> None:
+        self.start = self.last = time.perf_counter()
+        self.steps: List[Tuple[str, float]] = []
+        self.imports = ImportTimer()
+        self.reported = False
+
+    def mark(self, label: str) -> None:
+        """Record the time taken since the previous mark under `label`."""
+        now = time.perf_counter()
+        self.steps.append((label, now - self.last))
+        self.last = now
+
+    def report(self, top: int = 20) -> str:
+        """Return the startup steps and the slowest `top` module imports as text."""
+        lines = ["Startup timing report:"]
+        for label, elapsed in self.steps:
+            lines.append(f"  {elapsed * 1000:9.1f} ms  {label}")
+        lines.append(f"  {(self.last - self.start) * 1000:9.1f} ms  total")
+        lines.append("Slowest module imports (excluding nested imports):")
+        slowest = sorted(self.imports.self_times.items(), key=lambda x: -x[1])
+        for name, elapsed in slowest[:top]:
+            lines.append(f"  {elapsed * 1000:9.1f} ms  {name}")
+        return "\n".join(lines)
+
+
+timer: Optional[StartupTimer] = None
+if os.environ.get(ENVIRONMENT_VARIABLE):
+    timer = StartupTimer()
+    sys.meta_path.insert(0, timer.imports)
+
+
+def mark(label: str) -> None:
+    """Record a startup step if the report is enabled."""
+    if timer is not None:
+        timer.mark(label)
+
+
+def report() -> None:
+    """Print the startup report to stderr, but only the first time this is called."""
+    if timer is not None and not timer.reported:
+        timer.reported = True
+        print(timer.report(), file=sys.stderr)
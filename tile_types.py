@@ -21,6 +21,15 @@ tile_dt = np.dtype(
     ]
 )
 
+# The type of the tile index stored for each cell of a map.
+tile_id_dt = np.uint8
+
+
+# Maps store the index of each tiles type in this palette instead of the tile
+# itself, look up properties with palette["walkable"][tile_ids] and so on.
+# Indexes are saved with the map so tile types should only be added at the end.
+palette = np.zeros(0, dtype=tile_dt)
+
 
 def new_tile(
     *,  # Enforce the use of keywords, so that parameter order doesn't matter.
@@ -28,9 +37,14 @@ def new_tile(
     transparent: int,
     dark: Tuple[int, Tuple[int, int, int], Tuple[int, int, int]],
     light: Tuple[int, Tuple[int, int, int], Tuple[int, int, int]],
-) -> np.ndarray:
-    """Helper function for defining individual tile types """
-    return np.array((walkable, transparent, dark, light), dtype=tile_dt)
+) -> int:
+    """Helper function for defining individual tile types, returns the tiles index."""
+    global palette
+    if len(palette) > np.iinfo(tile_id_dt).max:
+        raise ValueError("There are too many tile types for tile_id_dt.")
+    tile = np.array((walkable, transparent, dark, light), dtype=tile_dt)
+    palette = np.append(palette, tile)
+    return len(palette) - 1
 
 
 # SHROUD represents unexplored, unseen tiles
@@ -0,0 +1,32 @@
+"""Traits and runes, stored as bit flags so that checking one is a single `&`."""
+from __future__ import annotations
+
+from enum import IntFlag
+from typing import Iterable, Type, TypeVar
+
+F = TypeVar("F", bound="Flags")
+
+
+class Flags(IntFlag):
+    @classmethod
+    def from_names(cls: Type[F], names: Iterable[str]) -> F:
+        """Return the flags named in `names`, such as ["finesse", "agile"]."""
+        flags = cls(0)
+        for name in names:
+            flags |= cls[name.upper()]
+        return flags
+
+
+class Trait(Flags):
+    AGILE = 1 << 0
+    FINESSE = 1 << 1
+    REACH = 1 << 2
+    THROWN = 1 << 3
+    UNARMED = 1 << 4
+    NONLETHAL = 1 << 5
+
+
+class Rune(Flags):
+    WEAPON_POTENCY = 1 << 0  # +1 item bonus to attack rolls.
+    STRIKING = 1 << 1  # One more weapon damage die.
+    ARMOR_POTENCY = 1 << 2  # +1 item bonus to AC.